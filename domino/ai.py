@@ -1,9 +1,13 @@
 
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 from collections import Counter
-from .models import Dom, Move
+from .models import Chain, Dom, Move
 from .rules import legal_moves
 from .belief import Belief
+from .bitboard import LEFT_MOVES, OPEN_MOVES, PIP_MASK, RIGHT_MOVES, TILE_ID, TILES, iter_bits
+
+# pesos de score_move: control, anti_gift, double_bonus, diversity (ajustables con domino.tune)
+WEIGHTS = (1.4, 1.2, 0.5, 0.3)
 
 def numbers_in_hand(hand: List[Dom]) -> Counter:
     c = Counter()
@@ -12,17 +16,14 @@ def numbers_in_hand(hand: List[Dom]) -> Counter:
     return c
 
 def estimate_play_prob(end: int, opponent_id: int, belief: Belief, hands_sizes: List[int]) -> float:
-    tiles = list({(min(end, k), max(end, k)) for k in range(7)})
-    p_no = 1.0
-    for d in tiles:
-        p_has = belief.prob_owner(d, opponent_id, hands_sizes)
-        p_no *= (1.0 - p_has)
-    return 1.0 - p_no
-
-def score_move(move: Move, hand_after: List[Dom], chain_after: List[Dom],
-               player_id: int, belief: Belief, hands_sizes: List[int]) -> float:
-    L = chain_after[0][0]
-    R = chain_after[-1][1]
+    """P(el rival tiene alguna ficha con `end`), contando repartos consistentes.
+    La creencia la cachea hasta su próximo mark_played / mark_pass."""
+    return belief.play_prob(end, opponent_id, hands_sizes)
+
+def score_move(move: Move, hand_after: List[Dom], ends_after: Tuple[int, int],
+               player_id: int, belief: Belief, hands_sizes: List[int],
+               weights: Sequence[float] = WEIGHTS) -> float:
+    L, R = ends_after
     cnt = numbers_in_hand(hand_after)
     control = cnt[L] + cnt[R]
     opp = (player_id + 1) % 4
@@ -32,18 +33,217 @@ def score_move(move: Move, hand_after: List[Dom], chain_after: List[Dom],
     a,b = move.dom
     double_bonus = 0.5 if a==b else 0.0
     diversity = len([x for x in range(7) if cnt[x]>0])
-    return 1.4*control + 1.2*anti_gift + 0.5*double_bonus + 0.3*diversity
+    wc, wa, wd, wv = weights
+    return wc*control + wa*anti_gift + wd*double_bonus + wv*diversity
+
+def score_moves(player_id: int, hand: List[Dom], ends: Tuple[int, int], moves: List[Move],
+                belief: Optional[Belief] = None, hands_sizes: Optional[List[int]] = None,
+                opp_probs: Optional[Sequence[float]] = None,
+                weights: Sequence[float] = WEIGHTS) -> List[float]:
+    """score_move para todas las jugadas a la vez (mismos valores, mismo orden de operaciones).
+    ends: extremos actuales ((-1,-1) con la mesa vacía). Los conteos de la mano se calculan una
+    vez y la probabilidad del rival una vez por número; opp_probs (7 valores) la da ya
+    calculada y evita consultar la creencia."""
+    cnt = [0] * 7
+    for a, b in hand:
+        cnt[a] += 1; cnt[b] += 1
+    div0 = 7 - cnt.count(0)
+    in_hand = set(hand)
+    probs: List[Optional[float]] = list(opp_probs) if opp_probs is not None else [None] * 7
+    opp = (player_id + 1) % 4
+    L0, R0 = ends
+    wc, wa, wd, wv = weights
+    out = []
+    for mv in moves:
+        a, b = mv.dom
+        if mv.side == "OPEN" or L0 < 0:
+            L, R = a, b
+        elif mv.side == "L":
+            L, R = a, R0
+        else:
+            L, R = L0, b
+        control = cnt[L] + cnt[R]
+        diversity = div0
+        # como en choose_move: la ficha sale de hand_after solo si mv.dom está tal cual en la mano
+        if mv.dom in in_hand:
+            control -= (a == L) + (b == L) + (a == R) + (b == R)
+            if a == b:
+                diversity -= cnt[a] == 2
+            else:
+                diversity -= (cnt[a] == 1) + (cnt[b] == 1)
+        pL = probs[L]
+        if pL is None:
+            pL = probs[L] = estimate_play_prob(L, opp, belief, hands_sizes)
+        pR = probs[R]
+        if pR is None:
+            pR = probs[R] = estimate_play_prob(R, opp, belief, hands_sizes)
+        anti_gift = 1.0 - max(pL, pR)
+        double_bonus = 0.5 if a==b else 0.0
+        out.append(wc*control + wa*anti_gift + wd*double_bonus + wv*diversity)
+    return out
 
-def choose_move(player_id: int, hand: List[Dom], chain: List[Dom],
-                belief: Belief, hands_sizes: List[int]) -> Move:
-    moves = legal_moves(chain, hand)
+def choose_move(player_id: int, hand: List[Dom], chain: Chain,
+                belief: Belief, hands_sizes: List[int],
+                moves: Optional[List[Move]] = None, endgame_tiles: int = 0,
+                weights: Sequence[float] = WEIGHTS, book=None) -> Move:
+    """endgame_tiles > 0: si en las manos quedan esa cantidad de fichas o menos, resuelve
+    el final exactamente (endgame.endgame_move) en vez de usar la heurística.
+    weights: pesos de score_move (ver WEIGHTS).
+    book: opening.OpeningBook; con la mesa vacía, la salida sale del libro si la tiene."""
+    if moves is None:
+        moves = legal_moves(chain, hand)
+    if book is not None and not chain:
+        mv = book.move(hand, moves)
+        if mv is not None:
+            return mv
+    if endgame_tiles and chain and len(moves) > 1 and sum(hands_sizes) <= endgame_tiles:
+        from .endgame import endgame_move
+        mv = endgame_move(player_id, chain, belief, hands_sizes, moves)
+        if mv is not None:
+            return mv
     best = None
     best_score = -1e9
-    for mv in moves:
-        chain_after = [mv.dom] if mv.side=='OPEN' else ([mv.dom]+chain if mv.side=='L' else chain+[mv.dom])
-        hand_after = [d for d in hand if d != mv.dom]
-        s = score_move(mv, hand_after, chain_after, player_id, belief, hands_sizes)
+    for mv, s in zip(moves, score_moves(player_id, hand, chain.ends(), moves, belief, hands_sizes,
+                                          weights=weights)):
         if s > best_score:
             best_score = s
             best = mv
     return best
+
+# posición para choose_moves: (jugador, mano, extremos ((-1,-1) mesa vacía), creencia,
+# tamaños de mano)
+Position = Tuple[int, List[Dom], Tuple[int, int], Belief, List[int]]
+
+def choose_moves(states: Sequence[Position], weights: Sequence[float] = WEIGHTS) -> List[Optional[Move]]:
+    """choose_move(pid, hand, chain, belief, sizes) para muchas posiciones en una sola
+    llamada: misma jugada en cada una (None si no hay jugadas). Las manos normalizadas y
+    ordenadas (como las reparte Game) van por choose_move_mask; las probabilidades del rival
+    por número se calculan una vez por (creencia, rival, tamaños) en todo el lote."""
+    shared: Dict[tuple, List[Optional[float]]] = {}
+    out: List[Optional[Move]] = []
+    for pid, hand, ends, belief, sizes in states:
+        mask = _sorted_mask(hand)
+        if mask is None:
+            chain = Chain([ends]) if ends[0] >= 0 else Chain()
+            out.append(choose_move(pid, hand, chain, belief, sizes, weights=weights))
+            continue
+        key = (id(belief), belief.version, (pid + 1) % 4, tuple(sizes))
+        probs = shared.get(key)
+        if probs is None:
+            probs = shared[key] = [None] * 7
+        out.append(choose_move_mask(pid, mask, ends, belief, sizes, weights, probs))
+    return out
+
+def _sorted_mask(hand: List[Dom]) -> Optional[int]:
+    """Máscara de una mano normalizada y ordenada (el orden de TILES); None si no lo está
+    (en ella el desempate de choose_move sigue otro orden)."""
+    m = 0
+    last = -1
+    for d in hand:
+        t = TILE_ID.get(d)
+        if t is None or t <= last or d[0] > d[1]:
+            return None
+        m |= 1 << t
+        last = t
+    return m
+
+# conteo por número de una mano-máscara, empaquetado en nibbles (número p en los bits
+# 4p..4p+3; la mula cuenta doble, como numbers_in_hand): suma de 4 tablas de 7 bits
+def _packed_counts(lo: int) -> List[int]:
+    out = []
+    for m in range(128):
+        c = 0
+        for i in iter_bits(m << lo):
+            if i < len(TILES):
+                a, b = TILES[i]
+                c += (1 << 4*a) + (1 << 4*b)
+        out.append(c)
+    return out
+
+_CNT = [_packed_counts(7 * k) for k in range(4)]
+_NIBBLE_LOW = 0x1111111
+
+def choose_move_mask(player_id: int, hand: int, ends: Tuple[int, int], belief: Belief,
+                     hands_sizes: List[int], weights: Sequence[float] = WEIGHTS,
+                     opp_probs: Optional[List[Optional[float]]] = None) -> Optional[Move]:
+    """choose_move sin libro ni finales con la mano como máscara (bitboard): misma jugada,
+    recorriendo las jugadas de legal_moves_mask sin armar la lista. Con una sola jugada no
+    puntúa nada. None si no hay jugadas.
+    opp_probs: 7 probabilidades del rival por número (None = sin calcular); se completa en
+    sitio, para compartirla entre posiciones con la misma creencia, rival y tamaños."""
+    L0, R0 = ends
+    if L0 < 0:
+        cands = [OPEN_MOVES[i] for i in iter_bits(hand)]
+    else:
+        mL = PIP_MASK[L0]
+        mR = PIP_MASK[R0]
+        cands = []
+        for i in iter_bits(hand & (mL | mR)):
+            if (mL >> i) & 1:
+                cands.append(LEFT_MOVES[i][L0])
+            if (mR >> i) & 1:
+                cands.append(RIGHT_MOVES[i][R0])
+    if len(cands) < 2:
+        return cands[0] if cands else None
+    c0, c1, c2, c3 = _CNT
+    packed = c0[hand & 127] + c1[(hand >> 7) & 127] + c2[(hand >> 14) & 127] + c3[hand >> 21]
+    div0 = ((packed | packed >> 1 | packed >> 2 | packed >> 3) & _NIBBLE_LOW).bit_count()
+    opp = (player_id + 1) % 4
+    probs = opp_probs if opp_probs is not None else [None] * 7
+    wc, wa, wd, wv = weights
+    best = None
+    best_score = -1e9
+    for mv in cands:
+        x, y = mv.dom
+        if L0 < 0:
+            L, R = x, y
+        elif mv.side == "L":
+            L, R = x, R0
+        else:
+            L, R = L0, y
+        control = (packed >> 4*L & 15) + (packed >> 4*R & 15)
+        diversity = div0
+        # la mano está normalizada: la ficha sale de hand_after solo si va tal cual (ver score_moves)
+        if x <= y:
+            control -= (x == L) + (y == L) + (x == R) + (y == R)
+            if x == y:
+                diversity -= (packed >> 4*x & 15) == 2
+            else:
+                diversity -= ((packed >> 4*x & 15) == 1) + ((packed >> 4*y & 15) == 1)
+        pL = probs[L]
+        if pL is None:
+            pL = probs[L] = belief.play_prob(L, opp, hands_sizes)
+        pR = probs[R]
+        if pR is None:
+            pR = probs[R] = belief.play_prob(R, opp, hands_sizes)
+        anti_gift = 1.0 - max(pL, pR)
+        double_bonus = 0.5 if x == y else 0.0
+        sc = wc*control + wa*anti_gift + wd*double_bonus + wv*diversity
+        if sc > best_score:
+            best_score = sc
+            best = mv
+    return best
+
+class HeuristicPlayer:
+    """Bot para Game.bots: choose_move con otros pesos (mismo estado que usa Game.step_ai)."""
+    def __init__(self, weights: Sequence[float] = WEIGHTS):
+        self.weights = tuple(weights)
+
+    def choose(self, g, pid: int) -> Move:
+        return choose_move(pid, g.hands[pid], g.chain, g.belief, g.hands_sizes(),
+                           moves=g.legal_moves(), endgame_tiles=g.endgame_tiles,
+                           weights=self.weights, book=g.opening_book)
+
+def make_bot(name: str, **kwargs):
+    """Bot para un asiento de Game.bots por nombre: 'heuristic' (None -> choose_move, o
+    HeuristicPlayer si se dan weights), 'pimc' (pimc.PIMCPlayer) o 'ismcts'
+    (ismcts.ISMCTSPlayer); kwargs van al constructor."""
+    if name == "heuristic":
+        return HeuristicPlayer(**kwargs) if kwargs else None
+    if name == "pimc":
+        from .pimc import PIMCPlayer
+        return PIMCPlayer(**kwargs)
+    if name == "ismcts":
+        from .ismcts import ISMCTSPlayer
+        return ISMCTSPlayer(**kwargs)
+    raise ValueError(f"estrategia desconocida: {name}")
@@ -0,0 +1,28 @@
+"""Servicio de jugadas en segundo plano: la decisión del bot se calcula sobre una copia del
+juego (Game.snapshot) en un hilo o en un proceso y se entrega como Future; quien la pide
+sigue libre (p. ej. el bucle de pygame) y aplica el resultado con Game.apply_ai."""
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from .models import Move
+
+def _decide(snap) -> Optional[Move]:
+    return snap.decide_ai()
+
+class MoveService:
+    """processes=False: un hilo; los bots se comparten con el juego y conservan su estado
+    (árboles de ISMCTS, rng). processes=True: un proceso aparte, libre del GIL; los bots
+    viajan serializados en cada petición, así que su estado no pasa de una jugada a otra."""
+    def __init__(self, processes: bool = False):
+        self.processes = processes
+        if processes:
+            self.executor = ProcessPoolExecutor(max_workers=1)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="domino-ai")
+
+    def submit(self, g) -> "Future[Optional[Move]]":
+        """Jugada (o None = pasar) del bot al que le toca en g, calculada en segundo plano."""
+        return self.executor.submit(_decide, g.snapshot())
+
+    def shutdown(self, wait: bool = False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,35 +1,347 @@
 
-from typing import Dict, List, Set
-from .models import Dom, normalize
+import random
+from bisect import bisect_right
+from math import factorial
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .models import Dom
+from .bitboard import FULL_MASK, PIP_MASK, TILES, TILE_ID, hand_to_mask, iter_bits
+
+Caps = Tuple[int, ...]
+Groups = List[Tuple[List[int], List[int]]]   # (dueños posibles, ids de fichas)
+
+def _compositions(n: int, owners: Sequence[int], caps: Caps) -> Iterator[Caps]:
+    """Formas de repartir n fichas entre `owners` sin exceder caps (tuplas por jugador)."""
+    k = [0] * len(caps)
+
+    def rec(i: int, left: int):
+        if i == len(owners) - 1:
+            p = owners[i]
+            if left <= caps[p]:
+                k[p] = left
+                yield tuple(k)
+                k[p] = 0
+            return
+        p = owners[i]
+        for x in range(min(left, caps[p]) + 1):
+            k[p] = x
+            yield from rec(i + 1, left - x)
+        k[p] = 0
+
+    if owners:
+        yield from rec(0, n)
+    elif n == 0:
+        yield tuple(k)
+
+class _Counts:
+    """Conteo exacto de repartos consistentes para un estado de la creencia y unos tamaños
+    de mano. Las fichas ocultas se agrupan por su conjunto de dueños posibles; ways(i, caps)
+    cuenta las formas de repartir los grupos i.. con capacidades caps (memoizado)."""
+
+    def __init__(self, groups: Groups, sizes: Caps):
+        self.groups = groups
+        self.sizes = sizes
+        self._ways: Dict[Tuple[int, Caps], int] = {}
+        self._options: Dict[Tuple[int, Caps], Tuple[List[Caps], List[int]]] = {}
+        self._marginals: Optional[Dict[int, List[float]]] = None
+        self.total = self.ways(0, sizes)
+
+    def options(self, i: int, caps: Caps) -> Tuple[List[Caps], List[int]]:
+        """Reparto del grupo i (composición k) y su número de completaciones acumulado."""
+        key = (i, caps)
+        hit = self._options.get(key)
+        if hit is not None:
+            return hit
+        owners, tiles = self.groups[i]
+        n = len(tiles)
+        ks: List[Caps] = []
+        cum: List[int] = []
+        acc = 0
+        for k in _compositions(n, owners, caps):
+            rest = tuple(c - x for c, x in zip(caps, k))
+            w = self.ways(i + 1, rest)
+            if w:
+                mult = factorial(n)
+                for x in k:
+                    mult //= factorial(x)
+                acc += mult * w
+                ks.append(k)
+                cum.append(acc)
+        self._options[key] = (ks, cum)
+        return ks, cum
+
+    def ways(self, i: int, caps: Caps) -> int:
+        if i == len(self.groups):
+            return 1 if not any(caps) else 0
+        key = (i, caps)
+        hit = self._ways.get(key)
+        if hit is None:
+            cum = self.options(i, caps)[1]
+            hit = cum[-1] if cum else 0
+            self._ways[key] = hit
+        return hit
+
+    def marginals(self) -> Dict[int, List[float]]:
+        """P(ficha en la mano de cada jugador) para cada ficha oculta (por id)."""
+        if self._marginals is not None:
+            return self._marginals
+        players = len(self.sizes)
+        out: Dict[int, List[float]] = {}
+        layer: Dict[Caps, int] = {self.sizes: 1} if self.total else {}
+        for i, (owners, tiles) in enumerate(self.groups):
+            n = len(tiles)
+            acc = [0] * players
+            nxt: Dict[Caps, int] = {}
+            for caps, f in layer.items():
+                ks, cum = self.options(i, caps)
+                prev = 0
+                for k, c in zip(ks, cum):
+                    # c - prev = (formas de repartir el grupo según k) * (completaciones)
+                    cnt, prev = c - prev, c
+                    rest = tuple(x - y for x, y in zip(caps, k))
+                    for p in owners:
+                        acc[p] += f * cnt * k[p]
+                    nxt[rest] = nxt.get(rest, 0) + f * (cnt // self.ways(i + 1, rest))
+            probs = [a / (n * self.total) for a in acc]
+            for t in tiles:
+                out[t] = probs
+            layer = nxt
+        self._marginals = out
+        return out
+
+    def sample(self, rng: random.Random) -> List[int]:
+        """Reparto uniforme entre todos los consistentes, como una máscara por jugador."""
+        hands = [0] * len(self.sizes)
+        caps = self.sizes
+        for i, (owners, tiles) in enumerate(self.groups):
+            ks, cum = self.options(i, caps)
+            k = ks[bisect_right(cum, rng.randrange(cum[-1]))]
+            order = rng.sample(tiles, len(tiles))
+            j = 0
+            for p in owners:
+                for t in order[j:j + k[p]]:
+                    hands[p] |= 1 << t
+                j += k[p]
+            caps = tuple(c - x for c, x in zip(caps, k))
+        return hands
 
 class Belief:
+    """Qué fichas puede tener cada jugador: una máscara de 28 bits por jugador (sobre
+    all_double6()) más las máscaras de fichas jugadas y no vistas."""
+    __slots__ = ("players", "masks", "played", "unseen", "version", "_counts", "_any", "_play")
+
     def __init__(self, players: int = 4):
         self.players = players
-        self.possible: Dict[Dom, Set[int]] = {}
-        self.unseen: Set[Dom] = set()
+        self.masks: List[int] = [FULL_MASK] * players
+        self.played = 0
+        self.unseen = FULL_MASK
+        # versión del estado: cambia con cada restricción nueva
+        self.version = 1
+        self._counts: Dict[Caps, _Counts] = {}
+        self._any: Dict[Tuple[int, int, Caps], float] = {}
+        self._play: Dict[Tuple[int, int, Caps], float] = {}
+
+    def _invalidate(self):
+        """Nueva versión: vacía las cachés en sitio (solo las que tienen algo)."""
+        self.version += 1
+        if self._counts:
+            self._counts.clear()
+        if self._any:
+            self._any.clear()
+        if self._play:
+            self._play.clear()
+
+    def copy(self) -> "Belief":
+        """Copia con las mismas restricciones (sin las cachés)."""
+        b = Belief(self.players)
+        b.masks = list(self.masks)
+        b.played = self.played
+        b.unseen = self.unseen
+        return b
 
     def init_with(self, all_tiles: List[Dom], hands: List[List[Dom]], me: int):
-        self.unseen = set(normalize(d) for d in all_tiles)
-        self.possible = {normalize(d): set(range(self.players)) for d in all_tiles}
+        tiles = hand_to_mask(all_tiles)
+        self.unseen = tiles
+        self.played = 0
+        self.masks = [tiles] * self.players
         for pid, hand in enumerate(hands):
-            for d in hand:
-                nd = normalize(d)
-                self.unseen.discard(nd)
-                self.possible[nd] = {pid}
-
-    def mark_played(self, d: Dom, by: int):
-        nd = normalize(d)
-        self.possible[nd] = {by}
-        self.unseen.discard(nd)
-
-    def mark_pass(self, player_id: int, left_end: int, right_end: int):
-        for d in list(self.unseen):
-            a, b = d
-            if a == left_end or b == left_end or a == right_end or b == right_end:
-                self.possible[d].discard(player_id)
+            m = hand_to_mask(hand)
+            self.unseen &= ~m
+            for p in range(self.players):
+                self.masks[p] = self.masks[p] | m if p == pid else self.masks[p] & ~m
+        self._invalidate()
+
+    def mark_played(self, d: Dom, by: int) -> int:
+        """Devuelve un testigo para unmark_played: bits 0-3 = jugadores que podían tenerla,
+        bit 4 = no vista, bit 5 = ya jugada."""
+        bit = 1 << TILE_ID[d]
+        undo = (32 if self.played & bit else 0) | (16 if self.unseen & bit else 0)
+        masks = self.masks
+        for p in range(self.players):
+            if masks[p] & bit:
+                undo |= 1 << p
+                masks[p] &= ~bit
+        self.played |= bit
+        self.unseen &= ~bit
+        self._invalidate()
+        return undo
+
+    def unmark_played(self, d: Dom, undo: int):
+        """Deshace mark_played(d, ...) con su testigo."""
+        bit = 1 << TILE_ID[d]
+        if not undo & 32:
+            self.played &= ~bit
+        if undo & 16:
+            self.unseen |= bit
+        masks = self.masks
+        for p in range(self.players):
+            if (undo >> p) & 1:
+                masks[p] |= bit
+        self._invalidate()
+
+    def mark_pass(self, player_id: int, left_end: int, right_end: int) -> int:
+        """Devuelve las fichas descartadas para player_id (testigo para unmark_pass)."""
+        drop = (PIP_MASK[left_end] | PIP_MASK[right_end]) & self.unseen & self.masks[player_id]
+        if drop:
+            self.masks[player_id] &= ~drop
+            self._invalidate()
+        return drop
+
+    def unmark_pass(self, player_id: int, drop: int):
+        """Deshace mark_pass con su testigo."""
+        if drop:
+            self.masks[player_id] |= drop
+            self._invalidate()
+
+    def owners(self, d: Dom) -> List[int]:
+        """Jugadores que pueden tener d en la mano (vacío si ya se jugó)."""
+        bit = 1 << TILE_ID[d]
+        return [p for p in range(self.players) if self.masks[p] & bit]
+
+    def _groups(self, exclude_mask: int = 0, exclude_pid: int = -1) -> Groups:
+        masks = list(self.masks)
+        if exclude_pid >= 0:
+            masks[exclude_pid] &= ~exclude_mask
+        hidden = FULL_MASK & ~self.played
+        groups: Groups = []
+        anyone = 0
+        for sig in range(1, 1 << self.players):
+            m = hidden
+            owners = []
+            for p in range(self.players):
+                if (sig >> p) & 1:
+                    m &= masks[p]
+                    owners.append(p)
+                else:
+                    m &= ~masks[p]
+            if m:
+                groups.append((owners, list(iter_bits(m))))
+                anyone |= m
+        if hidden & ~anyone:
+            # fichas ocultas sin dueño posible: ningún reparto es consistente
+            groups.append(([], list(iter_bits(hidden & ~anyone))))
+        # grupos más restringidos primero: menos estados intermedios
+        groups.sort(key=lambda g: len(g[0]))
+        return groups
+
+    def counts(self, hands_sizes: List[int]) -> _Counts:
+        """Tablas de conteo para estos tamaños de mano (memoizadas hasta el próximo mark_*)."""
+        key = tuple(hands_sizes)
+        c = self._counts.get(key)
+        if c is None:
+            c = _Counts(self._groups(), key)
+            self._counts[key] = c
+        return c
 
     def prob_owner(self, d: Dom, pid: int, hands_sizes: List[int]) -> float:
-        s = self.possible.get(normalize(d), set())
-        if pid not in s:
+        """P(pid tiene la ficha d en la mano), exacta: fracción de repartos consistentes con
+        las restricciones (jugadas, pases) y los tamaños de mano en que d es de pid."""
+        t = TILE_ID[d]
+        if not (self.masks[pid] >> t) & 1:
+            return 0.0
+        c = self.counts(hands_sizes)
+        if not c.total:
+            # tamaños inconsistentes con la creencia: reparto uniforme entre dueños posibles
+            return 1.0 / len(self.owners(d))
+        return c.marginals()[t][pid]
+
+    def prob_has_any_mask(self, tiles: int, pid: int, hands_sizes: List[int]) -> float:
+        """P(pid tiene al menos una de las fichas de la máscara), exacta (no asume
+        independencia entre fichas)."""
+        mine = tiles & self.masks[pid]
+        if not mine:
             return 0.0
-        return 1.0 / max(1, len(s))
+        for p in range(self.players):
+            if p != pid:
+                mine &= ~self.masks[p]
+        if mine:
+            return 1.0   # alguna solo puede ser suya
+        c = self.counts(hands_sizes)
+        if not c.total:
+            p_no = 1.0
+            for t in iter_bits(tiles):
+                p_no *= 1.0 - self.prob_owner(TILES[t], pid, hands_sizes)
+            return 1.0 - p_no
+        key = (tiles, pid, c.sizes)
+        hit = self._any.get(key)
+        if hit is None:
+            without = _Counts(self._groups(tiles, pid), c.sizes)
+            hit = 1.0 - without.total / c.total
+            self._any[key] = hit
+        return hit
+
+    def prob_has_any(self, tiles: List[Dom], pid: int, hands_sizes: List[int]) -> float:
+        return self.prob_has_any_mask(hand_to_mask(tiles), pid, hands_sizes)
+
+    def play_prob(self, end: int, pid: int, hands_sizes: List[int]) -> float:
+        """P(pid puede jugar por un extremo con el número `end`). Se cachea hasta el
+        próximo mark_played / mark_pass."""
+        key = (end, pid, tuple(hands_sizes))
+        hit = self._play.get(key)
+        if hit is None:
+            hit = self.prob_has_any_mask(PIP_MASK[end], pid, hands_sizes)
+            self._play[key] = hit
+        return hit
+
+    def sample_masks(self, hands_sizes: List[int], rng: random.Random) -> List[int]:
+        """Reparto uniforme de las fichas no jugadas (una máscara por jugador) entre los
+        consistentes con las restricciones y los tamaños de mano. ValueError si no hay ninguno."""
+        c = self.counts(hands_sizes)
+        if not c.total:
+            raise ValueError("creencia inconsistente con los tamaños de mano")
+        return c.sample(rng)
+
+    def sample_deal(self, hands_sizes: List[int], rng: random.Random) -> List[List[Dom]]:
+        """Como sample_masks, pero con las manos como listas de fichas."""
+        return [[TILES[t] for t in iter_bits(m)] for m in self.sample_masks(hands_sizes, rng)]
+
+    def iter_deals(self, hands_sizes: List[int]) -> Iterator[List[List[Dom]]]:
+        """Enumera todos los repartos consistentes de las fichas no jugadas (para finales:
+        crece combinatoriamente con el número de fichas ocultas)."""
+        need = list(hands_sizes)
+        hands: List[List[Dom]] = [[] for _ in range(self.players)]
+        free: List[Tuple[Dom, List[int]]] = []
+        for t in iter_bits(FULL_MASK & ~self.played):
+            owners = [p for p in range(self.players) if (self.masks[p] >> t) & 1]
+            if len(owners) == 1:
+                hands[owners[0]].append(TILES[t])
+                need[owners[0]] -= 1
+            else:
+                free.append((TILES[t], owners))
+        if any(n < 0 for n in need) or sum(need) != len(free):
+            return
+        free.sort(key=lambda f: len(f[1]))
+
+        def rec(i: int):
+            if i == len(free):
+                yield [list(h) for h in hands]
+                return
+            d, owners = free[i]
+            for p in owners:
+                if need[p] > 0:
+                    need[p] -= 1
+                    hands[p].append(d)
+                    yield from rec(i + 1)
+                    hands[p].pop()
+                    need[p] += 1
+
+        yield from rec(0)
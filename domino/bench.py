@@ -0,0 +1,248 @@
+"""Benchmarks sin interfaz de los caminos calientes, con semillas fijas.
+
+    python -m domino.bench --json bench.json
+    python -m domino.bench --baseline bench.json --tolerance 0.15
+
+Cada benchmark tiene una preparación (no se mide) y una corrida que hace `ops` operaciones;
+se reporta la mejor tasa (ops/s) entre varias repeticiones y el pico de memoria de una
+corrida (tracemalloc). Con --baseline se compara contra un JSON anterior y el proceso sale
+con código 1 si algo empeoró más que la tolerancia."""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .ai import choose_move, choose_moves
+from .belief import Belief
+from .cli_sim import play_match
+from .game import Game
+from .models import Chain
+from .rules import apply_move, legal_moves
+
+SEED = 12345
+
+# nombre -> fábrica(engine) -> (preparar, correr, ops por corrida)
+Bench = Tuple[Callable[[], object], Callable[[object], None], int]
+
+def _positions(engine: str, rounds: int = 40) -> List[Game]:
+    """Copias (Game.snapshot) de cada turno de `rounds` rondas con semillas fijas."""
+    out = []
+    rng = random.Random(SEED)
+    g = Game(rng, engine=engine)
+    for _ in range(rounds):
+        g.deal_round()
+        while not g.round_over():
+            out.append(g.snapshot())
+            g.step_ai()
+        a, b = g.round_score()
+        g.scores[0] += a; g.scores[1] += b
+        if max(g.scores) >= 100:
+            g.reset_scores()
+    return out
+
+def _rounds_log(engine: str, rounds: int = 40) -> List[list]:
+    out = []
+    g = Game(random.Random(SEED), engine=engine)
+    for _ in range(rounds):
+        g.deal_round()
+        while not g.round_over():
+            g.step_ai()
+        out.append(list(g.log))
+        g.round_score()
+    return out
+
+def bench_legal_moves(engine: str) -> Bench:
+    # el generador de cada motor: rules.legal_moves (list) o BitState.legal_moves (bits)
+    if engine == "bits":
+        states = [p.state for p in _positions(engine)]
+        def run(_):
+            for st in states:
+                st.legal_moves()
+        return (lambda: None), run, len(states)
+    pos = [(p.chain, p.hands[p.current]) for p in _positions(engine)]
+    def run(_):
+        for chain, hand in pos:
+            legal_moves(chain, hand)
+    return (lambda: None), run, len(pos)
+
+def bench_apply_move(engine: str) -> Bench:
+    logs = [[mv for _who, mv, _L, _R in log if mv is not None] for log in _rounds_log(engine)]
+    def run(_):
+        for moves in logs:
+            chain = Chain()
+            for mv in moves:
+                apply_move(chain, mv)
+    return (lambda: None), run, sum(len(m) for m in logs)
+
+def bench_mark_pass(engine: str) -> Bench:
+    # creencias tal como estaban antes de cada pase real (con la mesa ya abierta)
+    passes: List[Tuple[Belief, int, int, int]] = []
+    for log in _rounds_log(engine, 200):
+        b = Belief(players=4)
+        for who, mv, L, R in log:
+            if mv is None:
+                if L != -1:
+                    passes.append((b.copy(), who, L, R))
+                    b.mark_pass(who, L, R)
+            else:
+                b.mark_played(mv.dom, who)
+    def prepare():
+        return [(b.copy(), who, L, R) for b, who, L, R in passes]
+    def run(items):
+        for b, who, L, R in items:
+            b.mark_pass(who, L, R)
+    return prepare, run, len(passes)
+
+def bench_choose_move(engine: str) -> Bench:
+    pos = [(p.current, p.hands[p.current], p.chain, p.belief_for(p.current), p.hands_sizes())
+           for p in _positions(engine)]
+    def prepare():
+        # creencias sin caché, como en una partida real
+        return [(pid, hand, chain, b.copy(), sizes) for pid, hand, chain, b, sizes in pos]
+    def run(items):
+        for pid, hand, chain, b, sizes in items:
+            choose_move(pid, hand, chain, b, sizes)
+    return prepare, run, len(pos)
+
+def bench_choose_moves(engine: str) -> Bench:
+    # las mismas posiciones que choose_move, en un solo lote
+    pos = [(p.current, p.hands[p.current], p.chain.ends(), p.belief_for(p.current), p.hands_sizes())
+           for p in _positions(engine)]
+    def prepare():
+        return [(pid, hand, ends, b.copy(), sizes) for pid, hand, ends, b, sizes in pos]
+    def run(items):
+        choose_moves(items)
+    return prepare, run, len(pos)
+
+def bench_step_ai(engine: str) -> Bench:
+    pos = _positions(engine)
+    def prepare():
+        return [p.snapshot() for p in pos]
+    def run(games):
+        for g in games:
+            g.step_ai()
+    return prepare, run, len(pos)
+
+def bench_round(engine: str) -> Bench:
+    n = 100
+    def prepare():
+        return [Game(random.Random(SEED + i), engine=engine) for i in range(n)]
+    def run(games):
+        for g in games:
+            g.deal_round()
+            while not g.round_over():
+                g.step_ai()
+            g.round_score()
+    return prepare, run, n
+
+def bench_match(engine: str) -> Bench:
+    n = 10
+    def run(_):
+        for i in range(n):
+            play_match(SEED + i, engine)
+    return (lambda: None), run, n
+
+BENCHES: Dict[str, Callable[[str], Bench]] = {
+    "legal_moves": bench_legal_moves,
+    "apply_move": bench_apply_move,
+    "mark_pass": bench_mark_pass,
+    "choose_move": bench_choose_move,
+    "choose_moves": bench_choose_moves,
+    "step_ai": bench_step_ai,
+    "round": bench_round,
+    "match": bench_match,
+}
+
+def measure(bench: Bench, repeat: int = 5, min_time: float = 0.2) -> Dict:
+    """Mejor ops/s entre `repeat` mediciones (cada una repite la corrida hasta min_time)
+    y pico de memoria (KiB) de una corrida aparte bajo tracemalloc."""
+    prepare, run, ops = bench
+    best = 0.0
+    for _ in range(repeat):
+        done = 0
+        elapsed = 0.0
+        while elapsed < min_time:
+            state = prepare()
+            t0 = time.perf_counter()
+            run(state)
+            elapsed += time.perf_counter() - t0
+            done += ops
+        best = max(best, done / elapsed)
+    state = prepare()
+    tracemalloc.start()
+    try:
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"ops": ops, "ops_per_sec": best, "peak_kib": peak / 1024}
+
+def run_benchmarks(names: Optional[List[str]] = None, engine: str = "bits", repeat: int = 5,
+                   min_time: float = 0.2) -> Dict:
+    results = {}
+    for name in names or list(BENCHES):
+        results[name] = measure(BENCHES[name](engine), repeat, min_time)
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "engine": engine, "seed": SEED, "results": results}
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.15) -> List[str]:
+    """Regresiones de current frente a baseline: ops/s por debajo de (1 - tolerance) veces
+    el valor base, o pico de memoria por encima de (1 + tolerance) veces."""
+    out = []
+    base = baseline.get("results", {})
+    for name, r in current["results"].items():
+        b = base.get(name)
+        if b is None:
+            continue
+        if r["ops_per_sec"] < b["ops_per_sec"] * (1 - tolerance):
+            out.append(f"{name}: {r['ops_per_sec']:.0f} ops/s < base {b['ops_per_sec']:.0f}")
+        if r["peak_kib"] > b["peak_kib"] * (1 + tolerance):
+            out.append(f"{name}: pico {r['peak_kib']:.0f} KiB > base {b['peak_kib']:.0f}")
+    return out
+
+def print_results(res: Dict, baseline: Optional[Dict] = None):
+    base = (baseline or {}).get("results", {})
+    print(f"Python {res['python']}  engine={res['engine']}  semilla={res['seed']}")
+    for name, r in res["results"].items():
+        line = f"{name:<12} {r['ops_per_sec']:>12.1f} ops/s  {r['peak_kib']:>9.1f} KiB"
+        b = base.get(name)
+        if b:
+            line += f"  ({r['ops_per_sec'] / b['ops_per_sec'] - 1:+.1%} vs base)"
+        print(line)
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmarks de los caminos calientes")
+    ap.add_argument("names", nargs="*", help=f"benchmarks (por defecto: todos): {', '.join(BENCHES)}")
+    ap.add_argument("--engine", choices=("list", "bits"), default="bits")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--min-time", type=float, default=0.2, help="segundos mínimos por medición")
+    ap.add_argument("--json", default=None, help="escribe los resultados en este archivo")
+    ap.add_argument("--baseline", default=None, help="JSON de referencia para comparar")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="empeoramiento relativo tolerado")
+    args = ap.parse_args(argv)
+    unknown = [n for n in args.names if n not in BENCHES]
+    if unknown:
+        ap.error(f"benchmark desconocido: {', '.join(unknown)}")
+
+    res = run_benchmarks(args.names, args.engine, args.repeat, args.min_time)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(res, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    if baseline is not None:
+        bad = compare(res, baseline, args.tolerance)
+        for line in bad:
+            print("REGRESIÓN", line)
+        return 1 if bad else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import random
+from typing import Iterator, List, Optional, Tuple
+from .models import Dom, Move, all_double6
+
+# -------------------------------------------------
+# Representación compacta: cada mano es un entero de 28 bits sobre all_double6()
+# (bit i <=> TILES[i]); la mesa son sus dos extremos y su largo.
+# -------------------------------------------------
+TILES: List[Dom] = all_double6()
+N_TILES = len(TILES)
+FULL_MASK = (1 << N_TILES) - 1
+
+# acepta ambas orientaciones: (a,b) y (b,a) -> mismo id
+TILE_ID = {}
+for _i, (_a, _b) in enumerate(TILES):
+    TILE_ID[(_a, _b)] = _i
+    TILE_ID[(_b, _a)] = _i
+
+TILE_PIPS = [a + b for a, b in TILES]
+
+# PIP_MASK[p]: fichas que contienen el número p
+PIP_MASK = [0] * 7
+for _i, (_a, _b) in enumerate(TILES):
+    PIP_MASK[_a] |= 1 << _i
+    PIP_MASK[_b] |= 1 << _i
+
+# Jugadas precalculadas (misma orientación que rules.orient_for_left/right).
+# Son objetos compartidos: no se deben mutar.
+OPEN_MOVES: List[Move] = [Move(d, "OPEN") for d in TILES]
+LEFT_MOVES: List[List[Optional[Move]]] = []
+RIGHT_MOVES: List[List[Optional[Move]]] = []
+for _a, _b in TILES:
+    LEFT_MOVES.append([Move((_a, _b) if _b == e else (_b, _a), "L") if e in (_a, _b) else None
+                       for e in range(7)])
+    RIGHT_MOVES.append([Move((_a, _b) if _a == e else (_b, _a), "R") if e in (_a, _b) else None
+                        for e in range(7)])
+
+# Claves de Zobrist (64 bits, semilla fija: el hash es el mismo entre procesos y corridas).
+# Z_TILE[p][i]: ficha i en la mano de p (p = 0..3) o en la mesa (p = TABLE);
+# Z_LEFT/Z_RIGHT[e + 1]: extremo e (-1 = mesa vacía); Z_TURN[p]; Z_PASS[n]: n pases seguidos.
+TABLE = 4
+_zr = random.Random(0x5EED_D0_1105)
+Z_TILE = [[_zr.getrandbits(64) for _ in range(N_TILES)] for _ in range(5)]
+Z_LEFT = [_zr.getrandbits(64) for _ in range(8)]
+Z_RIGHT = [_zr.getrandbits(64) for _ in range(8)]
+Z_TURN = [_zr.getrandbits(64) for _ in range(4)]
+Z_PASS = [_zr.getrandbits(64) for _ in range(8)]
+del _zr
+
+
+def tile_id(d: Dom) -> int:
+    return TILE_ID[d]
+
+def hand_to_mask(hand: List[Dom]) -> int:
+    m = 0
+    for d in hand:
+        m |= 1 << TILE_ID[d]
+    return m
+
+def iter_bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def mask_to_hand(mask: int) -> List[Dom]:
+    return [TILES[i] for i in iter_bits(mask)]
+
+def mask_pips(mask: int) -> int:
+    return sum(TILE_PIPS[i] for i in iter_bits(mask))
+
+def other_end(tid: int, end: int) -> int:
+    return TILE_PIPS[tid] - end
+
+def zobrist(hands: List[int], left: int, right: int, current: int, passes_in_row: int) -> int:
+    """Hash de Zobrist calculado desde cero (las fichas que no están en ninguna mano están
+    en la mesa). Game lo mantiene en O(1) por jugada; esto sirve para verificarlo."""
+    h = Z_LEFT[left + 1] ^ Z_RIGHT[right + 1] ^ Z_TURN[current] ^ Z_PASS[passes_in_row]
+    table = FULL_MASK
+    for p, m in enumerate(hands):
+        table &= ~m
+        for i in iter_bits(m):
+            h ^= Z_TILE[p][i]
+    for i in iter_bits(table):
+        h ^= Z_TILE[TABLE][i]
+    return h
+
+def legal_moves_mask(L: int, R: int, hand: int) -> List[Move]:
+    """Mismas jugadas (y mismo orden) que rules.legal_moves sobre la mano ordenada."""
+    if L < 0:
+        return [OPEN_MOVES[i] for i in iter_bits(hand)]
+    mL = PIP_MASK[L]
+    mR = PIP_MASK[R]
+    playable = hand & (mL | mR)
+    moves: List[Move] = []
+    while playable:
+        low = playable & -playable
+        i = low.bit_length() - 1
+        playable ^= low
+        if low & mL:
+            moves.append(LEFT_MOVES[i][L])
+        if low & mR:
+            moves.append(RIGHT_MOVES[i][R])
+    return moves
+
+
+class BitState:
+    """Estado de una ronda: 4 manos como máscaras + extremos (L,R) + largo de la mesa.
+    L = R = -1 con la mesa vacía."""
+    __slots__ = ("hands", "left", "right", "length", "current", "passes_in_row")
+
+    def __init__(self, hands: List[int], left: int = -1, right: int = -1, length: int = 0,
+                 current: int = 0, passes_in_row: int = 0):
+        self.hands = hands
+        self.left = left
+        self.right = right
+        self.length = length
+        self.current = current
+        self.passes_in_row = passes_in_row
+
+    @classmethod
+    def from_lists(cls, hands: List[List[Dom]], chain_ends: Tuple[int, int], length: int,
+                   current: int, passes_in_row: int = 0) -> "BitState":
+        L, R = chain_ends
+        return cls([hand_to_mask(h) for h in hands], L, R, length, current, passes_in_row)
+
+    def copy(self) -> "BitState":
+        return BitState(list(self.hands), self.left, self.right, self.length,
+                        self.current, self.passes_in_row)
+
+    def load(self, other: "BitState"):
+        """Copia other sobre este estado en sitio (para reutilizarlo en simulaciones)."""
+        self.hands[:] = other.hands
+        self.left = other.left
+        self.right = other.right
+        self.length = other.length
+        self.current = other.current
+        self.passes_in_row = other.passes_in_row
+
+    def ends(self) -> Tuple[int, int]:
+        return (self.left, self.right)
+
+    def zobrist(self) -> int:
+        return zobrist(self.hands, self.left, self.right, self.current, self.passes_in_row)
+
+    def playable_mask(self, pid: Optional[int] = None) -> int:
+        hand = self.hands[self.current if pid is None else pid]
+        if self.left < 0:
+            return hand
+        return hand & (PIP_MASK[self.left] | PIP_MASK[self.right])
+
+    def has_move(self, pid: Optional[int] = None) -> bool:
+        return self.playable_mask(pid) != 0
+
+    def count_moves(self, pid: Optional[int] = None) -> int:
+        """len(legal_moves(pid)) sin armar la lista."""
+        hand = self.hands[self.current if pid is None else pid]
+        if self.left < 0:
+            return hand.bit_count()
+        return (hand & PIP_MASK[self.left]).bit_count() + (hand & PIP_MASK[self.right]).bit_count()
+
+    def legal_moves(self, pid: Optional[int] = None) -> List[Move]:
+        hand = self.hands[self.current if pid is None else pid]
+        return legal_moves_mask(self.left, self.right, hand)
+
+    def play_tile(self, tid: int, side: str):
+        """Juega la ficha tid del jugador actual por el lado 'L', 'R' u 'OPEN'."""
+        if self.left < 0:
+            a, b = TILES[tid]
+            self.left, self.right = a, b
+        elif side == "L":
+            self.left = TILE_PIPS[tid] - self.left
+        else:
+            self.right = TILE_PIPS[tid] - self.right
+        self.hands[self.current] &= ~(1 << tid)
+        self.length += 1
+        self.passes_in_row = 0
+        self.current = (self.current + 1) % 4
+
+    def play(self, mv: Move):
+        tid = TILE_ID[mv.dom]
+        if self.left < 0:
+            # OPEN: la ficha queda tal cual se jugó
+            a, b = mv.dom
+            self.hands[self.current] &= ~(1 << tid)
+            self.left, self.right = a, b
+            self.length += 1
+            self.passes_in_row = 0
+            self.current = (self.current + 1) % 4
+        else:
+            self.play_tile(tid, mv.side)
+
+    def pass_turn(self):
+        self.passes_in_row += 1
+        self.current = (self.current + 1) % 4
+
+    def round_over(self) -> bool:
+        h = self.hands
+        return self.passes_in_row >= 4 or not (h[0] and h[1] and h[2] and h[3])
+
+    def hand_sums(self) -> List[int]:
+        return [mask_pips(h) for h in self.hands]
+
+    def round_points(self) -> Tuple[int, int]:
+        """Mismo puntaje que Game.round_score (sin decidir el próximo abridor)."""
+        sums = self.hand_sums()
+        for pid in range(4):
+            if not self.hands[pid]:
+                if pid % 2 == 0:
+                    return (0, sums[1] + sums[3])
+                return (sums[0] + sums[2], 0)
+        sumA = sums[0] + sums[2]
+        sumB = sums[1] + sums[3]
+        if sumA < sumB:
+            return (sumB - sumA, 0)
+        if sumB < sumA:
+            return (0, sumA - sumB)
+        return (0, 0)
@@ -1,16 +1,5 @@
 
-from typing import List
 from .game import Game
-from .rules import legal_moves, apply_move
-from .models import normalize
-
-def remove_from_hand_norm(hand: List[tuple], dom: tuple):
-    tgt = normalize(dom)
-    for i, d in enumerate(hand):
-        if normalize(d) == tgt:
-            del hand[i]
-            return True
-    return False
 
 def pick_move_input(moves: list, chain: list):
     print(f"Mesa: {chain}")
@@ -38,28 +27,16 @@ def play_match():
         while not g.round_over():
             pid = g.current
             if pid == 0:
-                moves = legal_moves(g.chain, g.hands[0])
+                moves = g.legal_moves()
                 if not moves:
                     print("No puedes jugar. PASAS.")
-                    L,R = g.ends()
-                    if L != -1:
-                        g.belief.mark_pass(0, L, R)
-                    g.passes_in_row += 1
-                    g.current = (g.current + 1) % 4
+                    g.pass_turn()
                 else:
                     mv = pick_move_input(moves, g.chain)
                     if mv is None:
-                        L,R = g.ends()
-                        if L != -1:
-                            g.belief.mark_pass(0, L, R)
-                        g.passes_in_row += 1
-                        g.current = (g.current + 1) % 4
+                        g.pass_turn()
                     else:
-                        g.chain = apply_move(g.chain, mv)
-                        remove_from_hand_norm(g.hands[0], mv.dom)
-                        g.belief.mark_played(mv.dom, 0)
-                        g.passes_in_row = 0
-                        g.current = (g.current + 1) % 4
+                        g.play_move(mv)
             else:
                 mv = g.step_ai()
                 pid_played = (g.current - 1) % 4
@@ -1,14 +1,184 @@
-
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
 from .game import Game
+from .instrument import GameStats
+from .records import RecordWriter, RoundRecorder
 
-if __name__ == "__main__":
-    g = Game()
-    # Simple loop to 100 (console)
-    while g.scores[0] < 100 and g.scores[1] < 100:
-        g.deal_round()
+TARGET = 100
+
+def match_seed(master_seed: int, i: int) -> int:
+    """Semilla de la partida i derivada de la semilla maestra (no depende de los workers)."""
+    return random.Random(f"{master_seed}:{i}").getrandbits(64)
+
+def play_match(seed: Optional[int] = None, engine: str = "list", verbose: bool = False,
+               stats: Optional[GameStats] = None, record: bool = False, bots=None) -> Dict:
+    """Juega una partida IA vs IA hasta TARGET y devuelve sus estadísticas.
+    Cada ronda se reparte con su propia semilla (sacada del rng de la partida).
+    stats: si se da, el juego mide tiempos por fase y contadores sobre él.
+    record: agrega en "record" las rondas en el formato binario de records.
+    bots: jugadores por asiento (Game.bots); por defecto, la heurística en los cuatro."""
+    g = Game(random.Random(seed), engine=engine, stats=stats, bots=bots)
+    recorder = RoundRecorder() if record else None
+    recs = []
+    rounds = 0
+    blocked = 0
+    blocked_won = [0, 0]
+    round_wins = [0, 0]
+    while g.scores[0] < TARGET and g.scores[1] < TARGET:
+        round_seed = g.rng.getrandbits(64)
+        if recorder is not None:
+            recorder.begin(g)
+        g.deal_round(round_seed)
         while not g.round_over():
             g.step_ai()
+        is_blocked = all(len(h) > 0 for h in g.hands)
         a,b = g.round_score()
+        if recorder is not None:
+            recs.append(recorder.finish(g, round_seed, (a, b)))
         g.scores[0] += a; g.scores[1] += b
-        print(f"Ronda termina. A+{a}  B+{b}  => Marcador A={g.scores[0]} B={g.scores[1]}")
-    print("Ganador:", "Equipo A" if g.scores[0] >= 100 else "Equipo B")
+        rounds += 1
+        if a != b:
+            round_wins[0 if a > b else 1] += 1
+        if is_blocked:
+            blocked += 1
+            if a > b: blocked_won[0] += 1
+            elif b > a: blocked_won[1] += 1
+        if verbose:
+            print(f"Ronda termina. A+{a}  B+{b}  => Marcador A={g.scores[0]} B={g.scores[1]}")
+    winner = 0 if g.scores[0] >= TARGET else 1
+    if verbose:
+        print("Ganador:", "Equipo A" if winner == 0 else "Equipo B")
+    out = {"seed": seed, "winner": winner, "rounds": rounds, "points": list(g.scores),
+           "blocked": blocked, "blocked_won": blocked_won, "round_wins": round_wins}
+    if record:
+        out["record"] = b"".join(recs)
+    return out
+
+def _play_seeded(args) -> Dict:
+    seed, engine, with_stats, record = args
+    stats = GameStats() if with_stats else None
+    r = play_match(seed, engine, stats=stats, record=record)
+    if stats is not None:
+        r["stats"] = stats.snapshot()
+    return r
+
+def aggregate(results: Iterable[Dict]) -> Dict:
+    matches = 0
+    rounds = 0
+    blocked = 0
+    wins = [0, 0]
+    points = [0, 0]
+    blocked_won = [0, 0]
+    for r in results:
+        matches += 1
+        rounds += r["rounds"]
+        blocked += r["blocked"]
+        wins[r["winner"]] += 1
+        for t in (0, 1):
+            points[t] += r["points"][t]
+            blocked_won[t] += r["blocked_won"][t]
+    teams = []
+    for t in (0, 1):
+        teams.append({
+            "win_rate": wins[t] / max(1, matches),
+            "points_per_round": points[t] / max(1, rounds),
+            "blocked_won_per_round": blocked_won[t] / max(1, rounds),
+        })
+    return {"matches": matches, "rounds": rounds, "wins": wins, "points": points,
+            "blocked_rounds": blocked, "blocked_freq": blocked / max(1, rounds),
+            "teams": {"A": teams[0], "B": teams[1]}}
+
+def run_tournament(n_matches: int, master_seed: int = 0, workers: Optional[int] = None,
+                   engine: str = "bits", chunksize: int = 64, stats: bool = False,
+                   record_path: Optional[str] = None) -> Dict:
+    """Reparte n_matches partidas en un pool de procesos. Con la misma semilla maestra
+    el resultado es idéntico sin importar el número de workers.
+    stats=True agrega al resumen la instrumentación de Game sumada sobre todas las partidas.
+    record_path: anexa cada ronda a ese archivo (formato de records) según llegan las partidas."""
+    workers = workers or os.cpu_count() or 1
+    record = record_path is not None
+    jobs = [(match_seed(master_seed, i), engine, stats, record) for i in range(n_matches)]
+    writer = RecordWriter(record_path) if record else None
+    results: List[Dict] = []
+    ex = None
+    t0 = time.perf_counter()
+    try:
+        if workers <= 1:
+            stream: Iterable[Dict] = map(_play_seeded, jobs)
+        else:
+            ex = ProcessPoolExecutor(max_workers=workers)
+            stream = ex.map(_play_seeded, jobs, chunksize=chunksize)
+        for r in stream:
+            if writer is not None:
+                writer.write(r.pop("record"))
+            results.append(r)
+    finally:
+        if ex is not None:
+            ex.shutdown()
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - t0
+    summary = aggregate(results)
+    summary.update({"master_seed": master_seed, "workers": workers, "engine": engine,
+                    "seconds": elapsed, "matches_per_sec": n_matches / elapsed if elapsed > 0 else 0.0})
+    if stats:
+        summary["stats"] = GameStats.merged(r["stats"] for r in results).snapshot()
+    return summary
+
+def print_summary(s: Dict):
+    print(f"Partidas: {s['matches']}  Rondas: {s['rounds']}  Workers: {s['workers']}  "
+          f"Semilla: {s['master_seed']}")
+    for name in ("A", "B"):
+        t = s["teams"][name]
+        print(f"Equipo {name}: victorias {t['win_rate']*100:.2f}%  "
+              f"pts/ronda {t['points_per_round']:.3f}  "
+              f"bloqueos ganados/ronda {t['blocked_won_per_round']*100:.2f}%")
+    print(f"Rondas bloqueadas: {s['blocked_freq']*100:.2f}%")
+    print(f"Tiempo: {s['seconds']:.2f}s  ({s['matches_per_sec']:.1f} partidas/s)")
+    if "stats" in s:
+        for p, v in s["stats"]["phases"].items():
+            print(f"  {p:<12} {v['seconds']:8.3f}s  {v['calls']:>10} llamadas")
+        print("  " + "  ".join(f"{k}={v}" for k, v in s["stats"]["counters"].items()))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Simulación IA vs IA")
+    ap.add_argument("--matches", type=int, default=0,
+                    help="modo torneo: número de partidas (0 = una partida con detalle)")
+    ap.add_argument("--workers", type=int, default=None, help="procesos (por defecto: núcleos)")
+    ap.add_argument("--seed", type=int, default=None, help="semilla maestra")
+    ap.add_argument("--engine", choices=("list", "bits"), default="bits")
+    ap.add_argument("--json", default=None, help="escribe el resumen del torneo en este archivo")
+    ap.add_argument("--stats", action="store_true",
+                    help="mide tiempo por fase y contadores de Game (van al resumen y al --json)")
+    ap.add_argument("--record", default=None,
+                    help="anexa todas las rondas a este archivo binario (ver domino.records)")
+    ap.add_argument("--profile", default=None,
+                    help="corre en un solo proceso bajo cProfile y guarda el pstats en este archivo")
+    args = ap.parse_args(argv)
+
+    if args.matches <= 0:
+        play_match(args.seed, args.engine, verbose=True)
+        return
+    if args.profile:
+        prof = cProfile.Profile()
+        summary = prof.runcall(run_tournament, args.matches, args.seed or 0, 1, args.engine,
+                               stats=args.stats, record_path=args.record)
+        prof.dump_stats(args.profile)
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(20)
+    else:
+        summary = run_tournament(args.matches, args.seed or 0, args.workers, args.engine,
+                                 stats=args.stats, record_path=args.record)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
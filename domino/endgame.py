@@ -0,0 +1,126 @@
+"""Solver exacto de finales: alfa-beta sobre BitState con tabla de transposición.
+
+El valor de una posición es el margen final de Game.round_score visto por el equipo A
+(puntosA - puntosB); el equipo A maximiza y el B minimiza. La tabla se indexa por las cuatro
+manos, los extremos (sin orden: jugar por L o por R es simétrico), el turno y los pases."""
+import math
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from .belief import Belief
+from .bitboard import BitState, PIP_MASK, TILE_PIPS, hand_to_mask
+from .models import Chain, Move
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# fichas ordenadas por peso (las pesadas primero: suelen ser las mejores jugadas)
+_BY_WEIGHT = sorted(range(len(TILE_PIPS)), key=lambda i: -TILE_PIPS[i])
+
+class EndgameSolver:
+    def __init__(self, max_entries: int = 1 << 20):
+        self.tt: Dict[int, Tuple[int, int]] = {}
+        self.max_entries = max_entries
+        self.nodes = 0
+
+    @staticmethod
+    def key(st: BitState) -> int:
+        h = st.hands
+        L, R = (st.left, st.right) if st.left <= st.right else (st.right, st.left)
+        packed = h[0] | (h[1] << 28) | (h[2] << 56) | (h[3] << 84)
+        return (packed << 10) | ((L + 1) << 7) | ((R + 1) << 4) | (st.current << 2) | st.passes_in_row
+
+    def value(self, st: BitState, alpha: float = -math.inf, beta: float = math.inf) -> int:
+        """Margen A-B con juego perfecto de ambos equipos desde st (st queda intacto)."""
+        self.nodes += 1
+        if st.passes_in_row >= 4 or not (st.hands[0] and st.hands[1] and st.hands[2] and st.hands[3]):
+            a, b = st.round_points()
+            return a - b
+        key = self.key(st)
+        hit = self.tt.get(key)
+        if hit is not None:
+            v, flag = hit
+            if flag == EXACT:
+                return v
+            if flag == LOWER:
+                alpha = max(alpha, v)
+            else:
+                beta = min(beta, v)
+            if alpha >= beta:
+                return v
+        a0, b0 = alpha, beta
+
+        cur = st.current
+        hand = st.hands[cur]
+        L, R, length, passes = st.left, st.right, st.length, st.passes_in_row
+        playable = st.playable_mask()
+        if not playable:
+            st.pass_turn()
+            best = self.value(st, alpha, beta)
+            st.current, st.passes_in_row = cur, passes
+        else:
+            maximizing = cur % 2 == 0
+            best = -math.inf if maximizing else math.inf
+            for t in _BY_WEIGHT:
+                if not (playable >> t) & 1:
+                    continue
+                if L < 0:
+                    sides = ("OPEN",)
+                else:
+                    onL = (PIP_MASK[L] >> t) & 1
+                    onR = (PIP_MASK[R] >> t) & 1 and (R != L or not onL)
+                    sides = ("L", "R") if onL and onR else (("L",) if onL else ("R",))
+                for side in sides:
+                    st.play_tile(t, side)
+                    v = self.value(st, alpha, beta)
+                    st.hands[cur] = hand
+                    st.left, st.right, st.length = L, R, length
+                    st.current, st.passes_in_row = cur, passes
+                    if maximizing:
+                        if v > best:
+                            best = v
+                        alpha = max(alpha, v)
+                    else:
+                        if v < best:
+                            best = v
+                        beta = min(beta, v)
+                    if alpha >= beta:
+                        break
+                if alpha >= beta:
+                    break
+
+        if len(self.tt) >= self.max_entries:
+            self.tt.clear()
+        flag = UPPER if best <= a0 else (LOWER if best >= b0 else EXACT)
+        self.tt[key] = (best, flag)
+        return best
+
+    def move_values(self, st: BitState, moves: List[Move]) -> List[int]:
+        """Valor exacto (para el equipo que mueve en st) de cada jugada."""
+        sign = 1 if st.current % 2 == 0 else -1
+        out = []
+        child = st.copy()
+        for mv in moves:
+            child.load(st)
+            child.play(mv)
+            out.append(sign * self.value(child))
+        return out
+
+_SOLVER = EndgameSolver()
+
+def endgame_move(player_id: int, chain: Chain, belief: Belief, hands_sizes: List[int],
+                 moves: List[Move], worst_case: bool = True, max_deals: int = 64,
+                 solver: Optional[EndgameSolver] = None) -> Optional[Move]:
+    """Resuelve el final sobre los repartos consistentes con la creencia (uno solo si la
+    creencia los fija). worst_case=True maximiza el peor caso entre repartos; si no, el
+    promedio. Devuelve None si hay más de max_deals repartos posibles."""
+    deals = list(islice(belief.iter_deals(hands_sizes), max_deals + 1))
+    if not deals or len(deals) > max_deals:
+        return None
+    solver = solver or _SOLVER
+    totals = [math.inf if worst_case else 0.0] * len(moves)
+    for deal in deals:
+        st = BitState([hand_to_mask(h) for h in deal], chain.left, chain.right, len(chain), player_id, 0)
+        for i, v in enumerate(solver.move_values(st, moves)):
+            totals[i] = min(totals[i], v) if worst_case else totals[i] + v
+    best = max(range(len(moves)), key=totals.__getitem__)
+    return moves[best]
@@ -1,17 +1,39 @@
 
 from typing import List, Optional, Tuple
+import copy
 import random
-from .models import Dom, Move, normalize, all_double6
+from time import perf_counter
+from .models import Chain, Dom, Move, normalize, all_double6
 from .rules import legal_moves, apply_move
 from .belief import Belief
-from .ai import choose_move
+from .ai import choose_move, choose_move_mask
+from .bitboard import TABLE, TILE_ID, Z_LEFT, Z_PASS, Z_RIGHT, Z_TILE, Z_TURN, BitState, hand_to_mask, zobrist
+from .instrument import GameStats
 
 TEAM_A = {0,2}
 TEAM_B = {1,3}
 
 class Game:
-    def __init__(self, rng: Optional[random.Random]=None):
+    def __init__(self, rng: Optional[random.Random]=None, engine: str = "list", bots=None,
+                 endgame_tiles: int = 0, stats: Optional[GameStats] = None, opening_book=None):
+        """engine='list' usa las manos como listas (rules.legal_moves);
+        engine='bits' lleva el estado en un BitState: jugadas legales, tamaños de mano, fin de
+        ronda, quitar la ficha de la mano y la heurística salen de las máscaras (las manos
+        como listas se mantienen al día para los clientes y los bots).
+        bots: lista opcional de 4 jugadores con .choose(game, pid) -> Move; None en un
+        asiento usa la heurística de ai.choose_move.
+        endgame_tiles: umbral de fichas en manos para resolver el final exactamente (0 = nunca).
+        stats: instrument.GameStats para medir tiempo por fase y contar eventos (None = apagado).
+        opening_book: opening.OpeningBook para las salidas con la mesa vacía (heurística)."""
+        if engine not in ("list", "bits"):
+            raise ValueError(f"engine desconocido: {engine}")
         self.rng = rng or random.Random()
+        self.engine = engine
+        self.bots = list(bots) if bots is not None else [None]*4
+        self.endgame_tiles = endgame_tiles
+        self.state: Optional[BitState] = None
+        self.stats = stats
+        self.opening_book = opening_book
         self.reset_scores()
 
     def reset_scores(self):
@@ -19,12 +41,30 @@ class Game:
         self.first_round = True
         self.next_starter: Optional[int] = None  # quién abre la siguiente ronda
 
-    def deal_round(self):
+    def deal_round(self, seed: Optional[int] = None):
+        """Reparte una ronda. Con seed, el reparto sale de random.Random(seed) y no de
+        self.rng (así una ronda se reproduce sola a partir de su semilla)."""
+        st = self.stats
+        if st is None:
+            return self._deal_round(seed)
+        t0 = perf_counter()
+        self._deal_round(seed)
+        st.add("deal", t0)
+
+    def _deal_round(self, seed: Optional[int] = None):
         tiles = all_double6()
-        self.rng.shuffle(tiles)
+        (self.rng if seed is None else random.Random(seed)).shuffle(tiles)
         self.hands = [sorted(tiles[i*7:(i+1)*7]) for i in range(4)]
-        self.chain: List[Dom] = []
+        self.chain = Chain()
         self.passes_in_row = 0
+        # historial público de la ronda: (jugador, jugada o None si pasó, L, R antes de actuar)
+        self.log: List[Tuple[int, Optional[Move], int, int]] = []
+        # por cada entrada del log jugada con play_move/pass_turn: lo necesario para pop()
+        # ((índice en la mano, ficha) o None, testigo de Belief.mark_*, passes_in_row y
+        # zobrist anteriores)
+        self._undo: list = []
+        # identifica la ronda (sobrevive a snapshot(), que copia el log)
+        self.round_token = object()
         self.belief = Belief(players=4)
         self.belief.init_with(all_double6(), self.hands, me=-1)
 
@@ -34,7 +74,7 @@ class Game:
                 for pid in range(4):
                     if d in self.hands[pid]:
                         self.first_player = pid
-                        self.chain = [d]
+                        self.chain = Chain([d])
                         # remover (normalizado) de la mano del que abre
                         tgt = normalize(d)
                         for i, dd in enumerate(self.hands[pid]):
@@ -42,8 +82,10 @@ class Game:
                                 del self.hands[pid][i]
                                 break
                         self.belief.mark_played(d, pid)
+                        self.log.append((pid, Move(d, "OPEN"), -1, -1))
                         # pasa el turno al siguiente jugador (a su derecha)
                         self.current = (pid + 1) % 4
+                        self._sync_state()
                         return
             # en práctica no se llega aquí
         else:
@@ -52,46 +94,245 @@ class Game:
             self.first_player = starter
             self.current = starter
             # cadena vacía -> el abridor podrá jugar cualquier ficha (OPEN)
+            self._sync_state()
+
+    def _sync_state(self):
+        # hash de Zobrist del estado (manos/mesa, extremos, turno, pases); play_move,
+        # pass_turn y pop lo actualizan en O(1)
+        self.zobrist = self.compute_zobrist()
+        if self.engine == "bits":
+            self.state = BitState.from_lists(self.hands, self.ends(), len(self.chain),
+                                             self.current, self.passes_in_row)
 
     def ends(self) -> Tuple[int,int]:
-        if not self.chain: return (-1,-1)
-        return (self.chain[0][0], self.chain[-1][1])
+        return (self.chain.left, self.chain.right)
+
+    def compute_zobrist(self) -> int:
+        """El hash de Zobrist calculado desde cero (self.zobrist lo lleva al día)."""
+        return zobrist([hand_to_mask(h) for h in self.hands], self.chain.left, self.chain.right,
+                       self.current, self.passes_in_row)
 
     def team_index(self, pid: int) -> int:
         return 0 if pid in TEAM_A else 1
 
     def hands_sizes(self) -> List[int]:
+        if self.state is not None:
+            return [h.bit_count() for h in self.state.hands]
         return [len(h) for h in self.hands]
 
-    def _remove_from_hand_norm(self, pid: int, dom: Dom):
+    def _remove_from_hand_norm(self, pid: int, dom: Dom) -> Optional[Tuple[int, Dom]]:
+        """Quita dom (en cualquier orientación) de la mano; (índice, ficha) o None."""
         tgt = normalize(dom)
         hand = self.hands[pid]
         for i, d in enumerate(hand):
             if normalize(d) == tgt:
                 del hand[i]
-                return True
-        return False
+                return i, d
+        return None
 
-    def step_ai(self):
+    def belief_for(self, pid: int) -> Belief:
+        """Creencia desde el punto de vista de pid: solo su mano más lo público (jugadas y pases)."""
+        b = Belief(players=4)
+        b.init_with(all_double6(), [self.hands[p] if p == pid else [] for p in range(4)], me=pid)
+        for who, mv, L, R in self.log:
+            if mv is None:
+                if L != -1:
+                    b.mark_pass(who, L, R)
+            else:
+                b.mark_played(mv.dom, who)
+        return b
+
+    def legal_moves(self) -> List[Move]:
+        st = self.stats
+        if st is not None:
+            t0 = perf_counter()
+            moves = self._legal_moves()
+            st.add("legal_moves", t0)
+            return moves
+        return self._legal_moves()
+
+    def _legal_moves(self) -> List[Move]:
+        if self.state is not None:
+            return self.state.legal_moves(self.current)
+        return legal_moves(self.chain, self.hands[self.current])
+
+    def play_move(self, mv: Move):
+        """Aplica la jugada del jugador actual y pasa el turno."""
         pid = self.current
-        hand = self.hands[pid]
-        moves = legal_moves(self.chain, hand)
-        if not moves:
-            L,R = self.ends()
+        L, R = self.chain.left, self.chain.right
+        self.chain = apply_move(self.chain, mv)   # ValueError si no encaja: nada cambió todavía
+        self.log.append((pid, mv, L, R))
+        t = TILE_ID[mv.dom]
+        state = self.state
+        if state is not None:
+            # la mano está ordenada como all_double6(): su índice es el número de fichas
+            # con id menor en la máscara
+            mask = state.hands[pid]
+            if (mask >> t) & 1:
+                i = (mask & ((1 << t) - 1)).bit_count()
+                taken = (i, self.hands[pid].pop(i))
+            else:
+                taken = None
+        else:
+            taken = self._remove_from_hand_norm(pid, mv.dom)
+        nxt = (pid + 1) % 4
+        prev_hash = self.zobrist
+        self.zobrist ^= (Z_TILE[pid][t] ^ Z_TILE[TABLE][t]
+                         ^ Z_LEFT[L + 1] ^ Z_LEFT[self.chain.left + 1]
+                         ^ Z_RIGHT[R + 1] ^ Z_RIGHT[self.chain.right + 1]
+                         ^ Z_TURN[pid] ^ Z_TURN[nxt] ^ Z_PASS[self.passes_in_row] ^ Z_PASS[0])
+        st = self.stats
+        if st is None:
+            undo = self.belief.mark_played(mv.dom, pid)
+        else:
+            t0 = perf_counter()
+            undo = self.belief.mark_played(mv.dom, pid)
+            st.add("belief", t0)
+            st.count("moves")
+        self._undo.append((taken, undo, self.passes_in_row, prev_hash))
+        self.passes_in_row = 0
+        self.current = nxt
+        if state is not None:
+            state.play(mv)
+
+    def pass_turn(self):
+        """El jugador actual pasa."""
+        L,R = self.ends()
+        self.log.append((self.current, None, L, R))
+        undo = 0
+        st = self.stats
+        if st is not None:
+            t0 = perf_counter()
             if L!=-1:
-                self.belief.mark_pass(pid, L, R)
-            self.passes_in_row += 1
-            self.current = (self.current + 1) % 4
+                undo = self.belief.mark_pass(self.current, L, R)
+            st.add("belief", t0)
+            st.count("passes")
+        elif L!=-1:
+            undo = self.belief.mark_pass(self.current, L, R)
+        pid = self.current
+        nxt = (pid + 1) % 4
+        n = self.passes_in_row
+        self._undo.append((None, undo, n, self.zobrist))
+        self.zobrist ^= Z_TURN[pid] ^ Z_TURN[nxt] ^ Z_PASS[n] ^ Z_PASS[n + 1]
+        self.passes_in_row = n + 1
+        self.current = nxt
+        if self.state is not None:
+            self.state.pass_turn()
+
+    def push(self, mv: Optional[Move]):
+        """Aplica la jugada legal mv del jugador actual (None = pasa); pop() la deshace."""
+        if mv is None:
+            self.pass_turn()
+        else:
+            self.play_move(mv)
+
+    def pop(self) -> Optional[Move]:
+        """Deshace la última jugada o pase (push, play_move o pass_turn) sin copiar nada:
+        mano, mesa, turno, pases seguidos, log, creencia y BitState quedan como antes.
+        Devuelve la jugada deshecha (None si fue un pase). La salida forzada de la primera
+        ronda no se deshace."""
+        if not self._undo:
+            raise IndexError("no hay jugadas para deshacer")
+        taken, undo, passes, self.zobrist = self._undo.pop()
+        pid, mv, L, R = self.log.pop()
+        self.passes_in_row = passes
+        self.current = pid
+        if mv is None:
+            self.belief.unmark_pass(pid, undo)
+        else:
+            self.belief.unmark_played(mv.dom, undo)
+            if L == -1 or mv.side == "R":
+                self.chain.pop()
+            else:
+                self.chain.popleft()
+            if taken is not None:
+                self.hands[pid].insert(*taken)
+        st = self.state
+        if st is not None:
+            if mv is not None:
+                st.hands[pid] |= 1 << TILE_ID[mv.dom]
+                st.left, st.right = L, R
+                st.length -= 1
+            st.current, st.passes_in_row = pid, passes
+        return mv
+
+    def snapshot(self) -> "Game":
+        """Copia del estado de la ronda que se puede consultar en otro hilo o proceso sin
+        tocar este juego. Los bots se comparten (no se copian); la copia no mide (stats=None)."""
+        g = copy.copy(self)
+        g.stats = None
+        g.rng = random.Random()
+        g.rng.setstate(self.rng.getstate())
+        g.bots = list(self.bots)
+        g.scores = list(self.scores)
+        g.hands = [list(h) for h in self.hands]
+        g.chain = self.chain.copy()
+        g.log = list(self.log)
+        g._undo = list(self._undo)
+        g.belief = self.belief.copy()
+        if self.state is not None:
+            g.state = self.state.copy()
+        return g
+
+    def decide_ai(self) -> Optional[Move]:
+        """Jugada del bot del jugador actual sin aplicarla (None = pasa)."""
+        pid = self.current
+        bot = self.bots[pid]
+        state = self.state
+        if bot is None and state is not None and self._mask_heuristic():
+            # la heurística directo sobre las máscaras, sin armar la lista de jugadas
+            st = self.stats
+            if st is None:
+                return choose_move_mask(pid, state.hands[pid], self.ends(), self.belief,
+                                        self.hands_sizes())
+            n = state.count_moves(pid)
+            if not n:
+                return None
+            st.count("moves_evaluated", n)
+            t0 = perf_counter()
+            mv = choose_move_mask(pid, state.hands[pid], self.ends(), self.belief,
+                                  self.hands_sizes())
+            st.add("choose_move", t0)
+            return mv
+        moves = self.legal_moves()
+        if not moves:
             return None
-        mv = choose_move(pid, hand, self.chain, self.belief, self.hands_sizes())
-        self.chain = apply_move(self.chain, mv)
-        self._remove_from_hand_norm(pid, mv.dom)
-        self.belief.mark_played(mv.dom, pid)
-        self.passes_in_row = 0
-        self.current = (self.current + 1) % 4
+        st = self.stats
+        if st is not None:
+            st.count("moves_evaluated", len(moves))
+            t0 = perf_counter()
+        if bot is not None:
+            mv = bot.choose(self, pid)
+        else:
+            mv = choose_move(pid, self.hands[pid], self.chain, self.belief, self.hands_sizes(),
+                             moves=moves, endgame_tiles=self.endgame_tiles, book=self.opening_book)
+        if st is not None:
+            st.add("choose_move", t0)
+        return mv
+
+    def _mask_heuristic(self) -> bool:
+        """True si la decisión de la heurística no pasa por el libro ni por el solver de
+        finales (choose_move_mask da entonces la misma jugada que choose_move)."""
+        if self.opening_book is not None and not self.chain:
+            return False
+        return not (self.endgame_tiles and self.chain
+                    and sum(self.hands_sizes()) <= self.endgame_tiles)
+
+    def apply_ai(self, mv: Optional[Move]):
+        """Aplica una jugada devuelta por decide_ai."""
+        if mv is None:
+            self.pass_turn()
+        else:
+            self.play_move(mv)
+
+    def step_ai(self):
+        mv = self.decide_ai()
+        self.apply_ai(mv)
         return mv
 
     def round_over(self) -> bool:
+        if self.state is not None:
+            return self.state.round_over()
         if any(len(h)==0 for h in self.hands):
             return True
         if self.passes_in_row >= 4:
@@ -101,6 +342,19 @@ class Game:
     def round_score(self) -> Tuple[int,int]:
         """Calcula puntos y además fija quién abre la PRÓXIMA ronda.
         Regresa (puntosA, puntosB)."""
+        st = self.stats
+        if st is None:
+            return self._round_score()
+        t0 = perf_counter()
+        blocked = all(len(h) > 0 for h in self.hands)
+        out = self._round_score()
+        st.add("scoring", t0)
+        st.count("rounds")
+        if blocked:
+            st.count("blocked_rounds")
+        return out
+
+    def _round_score(self) -> Tuple[int,int]:
         sums = [sum(a+b for a,b in h) for h in self.hands]
         empties = [i for i,h in enumerate(self.hands) if len(h)==0]
 
@@ -0,0 +1,53 @@
+"""Instrumentación opcional de Game: tiempo por fase y contadores.
+
+Se activa pasando Game(stats=GameStats()); con stats=None (por defecto) cada punto de
+medición cuesta solo una comparación. Las fases de un bot con .choose anidan: su
+generación de jugadas cuenta también en legal_moves."""
+import json
+from time import perf_counter
+from typing import Dict, Iterable
+
+PHASES = ("deal", "legal_moves", "choose_move", "belief", "scoring")
+COUNTERS = ("moves_evaluated", "moves", "passes", "rounds", "blocked_rounds")
+
+class GameStats:
+    __slots__ = ("seconds", "calls", "counters")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.seconds: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.calls: Dict[str, int] = dict.fromkeys(PHASES, 0)
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+
+    def add(self, phase: str, t0: float):
+        """Suma a `phase` el tiempo transcurrido desde t0 (perf_counter)."""
+        self.seconds[phase] += perf_counter() - t0
+        self.calls[phase] += 1
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def snapshot(self) -> Dict:
+        """Estado actual como dict serializable a JSON."""
+        return {"phases": {p: {"seconds": self.seconds[p], "calls": self.calls[p]} for p in PHASES},
+                "counters": dict(self.counters)}
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def merge(self, snap: Dict):
+        """Acumula un snapshot (p. ej. el de otra partida u otro proceso)."""
+        for p, v in snap["phases"].items():
+            self.seconds[p] += v["seconds"]
+            self.calls[p] += v["calls"]
+        for k, v in snap["counters"].items():
+            self.counters[k] += v
+
+    @classmethod
+    def merged(cls, snaps: Iterable[Dict]) -> "GameStats":
+        out = cls()
+        for s in snaps:
+            out.merge(s)
+        return out
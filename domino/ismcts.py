@@ -0,0 +1,149 @@
+"""ISMCTS (single observer): un solo árbol sobre conjuntos de información, una determinización
+por iteración muestreada de la creencia del jugador, y reutilización del subárbol entre turnos.
+
+Las acciones del dominó son públicas, así que un nodo equivale a la secuencia de acciones
+desde la raíz; tras jugar, se desciende por las acciones reales (Game.log) y se conserva
+la estadística acumulada."""
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .belief import Belief
+from .bitboard import BitState, TILE_ID
+from .models import Move
+from .pimc import ROLLOUTS, margin
+
+Action = Optional[Tuple[int, str]]   # (id de ficha, lado) o None = pasar
+
+REWARD_SCALE = 50.0   # margen de puntos -> recompensa
+
+def action_key(mv: Optional[Move]) -> Action:
+    if mv is None:
+        return None
+    return (TILE_ID[mv.dom], mv.side)
+
+class Node:
+    __slots__ = ("player", "visits", "total", "avail", "children")
+
+    def __init__(self, player: int = -1):
+        self.player = player      # quién hizo la acción que lleva a este nodo
+        self.visits = 0
+        self.total = 0.0          # recompensa acumulada para el equipo de `player`
+        self.avail = 0
+        self.children: Dict[Action, "Node"] = {}
+
+def _iterate(root: Node, st: BitState, pid: int, c: float, play_out, rng: random.Random):
+    node = root
+    path: List[Node] = []
+    while not st.round_over():
+        moves = st.legal_moves()
+        acts = [(action_key(mv), mv) for mv in moves] if moves else [(None, None)]
+        children = node.children
+        untried = []
+        for key, mv in acts:
+            ch = children.get(key)
+            if ch is None:
+                untried.append((key, mv))
+            else:
+                ch.avail += 1
+        if untried:
+            key, mv = untried[rng.randrange(len(untried))]
+            child = Node(st.current)
+            child.avail = 1
+            children[key] = child
+            path.append(child)
+            if mv is None:
+                st.pass_turn()
+            else:
+                st.play(mv)
+            break
+        best = best_mv = None
+        best_u = -math.inf
+        for key, mv in acts:
+            ch = children[key]
+            u = ch.total / ch.visits + c * math.sqrt(math.log(ch.avail) / ch.visits)
+            if u > best_u:
+                best_u, best, best_mv = u, ch, mv
+        path.append(best)
+        if best_mv is None:
+            st.pass_turn()
+        else:
+            st.play(best_mv)
+        node = best
+    play_out(st, rng)
+    m = margin(st, pid) / REWARD_SCALE
+    for n in path:
+        n.visits += 1
+        n.total += m if n.player % 2 == pid % 2 else -m
+
+def ismcts_search(root: Node, pid: int, moves: List[Move], belief: Belief, hands_sizes: List[int],
+                  ends: Tuple[int, int], length: int, passes_in_row: int,
+                  iterations: int = 1000, time_budget: Optional[float] = None, c: float = 0.7,
+                  rollout: str = "greedy", rng: Optional[random.Random] = None) -> Move:
+    """Itera sobre `root` (que puede traer estadística previa) hasta `iterations` o hasta
+    agotar `time_budget` segundos y devuelve la jugada legal más visitada."""
+    rng = rng or random.Random()
+    play_out = ROLLOUTS[rollout]
+    L, R = ends
+    base = BitState([0, 0, 0, 0], L, R, length, pid, passes_in_row)
+    st = BitState([0, 0, 0, 0])
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    done = 0
+    while done < iterations:
+        base.hands[:] = belief.sample_masks(hands_sizes, rng)
+        st.load(base)
+        _iterate(root, st, pid, c, play_out, rng)
+        done += 1
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+    best = moves[0]
+    best_n = -1
+    for mv in moves:
+        ch = root.children.get(action_key(mv))
+        if ch is not None and ch.visits > best_n:
+            best, best_n = mv, ch.visits
+    return best
+
+class ISMCTSPlayer:
+    """Bot para Game.bots. Guarda el árbol de cada asiento y, en el siguiente turno de la
+    misma ronda, arranca desde el subárbol alcanzado por las acciones reales."""
+    def __init__(self, iterations: int = 1000, time_budget: Optional[float] = None, c: float = 0.7,
+                 rollout: str = "greedy", reuse: bool = True, rng: Optional[random.Random] = None):
+        if rollout not in ROLLOUTS:
+            raise ValueError(f"rollout desconocido: {rollout}")
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.c = c
+        self.rollout = rollout
+        self.reuse = reuse
+        self.rng = rng or random.Random()
+        # pid -> (ronda (Game.round_token), largo del log en la raíz, raíz)
+        self.trees: Dict[int, Tuple[object, int, Node]] = {}
+        self.reused_visits = 0
+
+    def _root_for(self, g, pid: int) -> Node:
+        saved = self.trees.get(pid)
+        if self.reuse and saved is not None and saved[0] is g.round_token and len(g.log) >= saved[1]:
+            node: Optional[Node] = saved[2]
+            for _who, mv, _L, _R in g.log[saved[1]:]:
+                node = node.children.get(action_key(mv))
+                if node is None:
+                    break
+            if node is not None:
+                self.reused_visits = node.visits
+                return node
+        self.reused_visits = 0
+        return Node()
+
+    def choose(self, g, pid: int) -> Move:
+        moves = g.legal_moves()
+        root = self._root_for(g, pid)
+        if len(moves) > 1:
+            best = ismcts_search(root, pid, moves, g.belief_for(pid), g.hands_sizes(), g.ends(),
+                                 len(g.chain), g.passes_in_row, self.iterations, self.time_budget,
+                                 self.c, self.rollout, self.rng)
+        else:
+            best = moves[0]
+        self.trees[pid] = (g.round_token, len(g.log), root)
+        return best
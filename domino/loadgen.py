@@ -0,0 +1,138 @@
+"""Generador de carga para domino.server: muchas mesas con un humano simulado (jugada legal
+al azar) repartidas en varias conexiones; reporta jugadas/s y latencia de cada jugada.
+
+    python -m domino.loadgen --tables 1000 --connections 50 --duration 20
+    python -m domino.loadgen --port 8765 ...   (contra un servidor ya corriendo)
+
+Sin --port levanta el servidor en este mismo proceso en un puerto libre."""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+from .server import MAX_LINE, TableServer, make_executor
+
+class Client:
+    """Una conexión: pedidos con id, respuestas despachadas a futures."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._task = asyncio.create_task(self._read())
+
+    async def _read(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            resp = json.loads(line)
+            fut = self.pending.pop(resp.get("id"), None)
+            if fut is not None and not fut.done():
+                fut.set_result(resp)
+        for fut in self.pending.values():
+            if not fut.done():
+                fut.set_exception(ConnectionError("conexión cerrada"))
+
+    async def call(self, **req) -> Dict:
+        rid = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        self.pending[rid] = fut
+        req["id"] = rid
+        self.writer.write(json.dumps(req, separators=(",", ":")).encode() + b"\n")
+        await self.writer.drain()
+        resp = await fut
+        if not resp.get("ok"):
+            raise RuntimeError(resp.get("error"))
+        return resp
+
+    async def close(self):
+        self.writer.close()
+        await self._task
+
+def _count_actions(events: List[list]) -> int:
+    return sum(1 for e in events if e[0] in ("move", "pass"))
+
+async def _table_loop(c: Client, seed: int, deadline: float, lat: List[float], stats: Dict):
+    rng = random.Random(seed)
+    st = await c.call(op="new", humans=[0], seed=seed)
+    stats["tables"] += 1
+    while time.perf_counter() < deadline:
+        stats["actions"] += _count_actions(st["events"])
+        if st["over"]:
+            stats["matches"] += 1
+            await c.call(op="close", table=st["table"])
+            st = await c.call(op="new", humans=[0], seed=rng.getrandbits(32))
+            continue
+        legal = st["legal"]
+        idx = rng.randrange(len(legal)) if legal else -1
+        t0 = time.perf_counter()
+        st = await c.call(op="move", table=st["table"], index=idx)
+        lat.append(time.perf_counter() - t0)
+    await c.call(op="close", table=st["table"])
+
+def percentile(xs: List[float], q: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+async def run_load(tables: int = 1000, connections: int = 50, duration: float = 20.0,
+                   host: str = "127.0.0.1", port: Optional[int] = None,
+                   executor_kind: str = "process", workers: Optional[int] = None,
+                   seed: int = 0) -> Dict:
+    server = None
+    if port is None:
+        server = TableServer(make_executor(executor_kind, workers))
+        srv = await server.start(host, 0)
+        port = srv.sockets[0].getsockname()[1]
+    clients = []
+    for _ in range(connections):
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        clients.append(Client(reader, writer))
+    lat: List[float] = []
+    stats = {"tables": 0, "matches": 0, "actions": 0}
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    await asyncio.gather(*(_table_loop(clients[i % connections], seed * 1_000_003 + i, deadline, lat, stats)
+                           for i in range(tables)))
+    elapsed = time.perf_counter() - t0
+    for c in clients:
+        await c.close()
+    if server is not None:
+        await server.close()
+    return {"tables": tables, "connections": connections, "seconds": elapsed,
+            "human_moves": len(lat), "actions": stats["actions"], "matches": stats["matches"],
+            "moves_per_sec": stats["actions"] / elapsed,
+            "human_moves_per_sec": len(lat) / elapsed,
+            "latency_ms": {"p50": percentile(lat, 0.50) * 1000, "p99": percentile(lat, 0.99) * 1000,
+                           "max": max(lat, default=0.0) * 1000}}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Carga sobre el servidor de mesas")
+    ap.add_argument("--tables", type=int, default=1000)
+    ap.add_argument("--connections", type=int, default=50)
+    ap.add_argument("--duration", type=float, default=20.0, help="segundos de carga")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=None, help="servidor externo (si no, uno en proceso)")
+    ap.add_argument("--executor", choices=("process", "thread", "inline"), default="process")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args(argv)
+    r = asyncio.run(run_load(args.tables, args.connections, args.duration, args.host, args.port,
+                             args.executor, args.workers, args.seed))
+    lat = r["latency_ms"]
+    print(f"Mesas: {r['tables']}  conexiones: {r['connections']}  {r['seconds']:.1f}s  "
+          f"partidas terminadas: {r['matches']}")
+    print(f"Jugadas: {r['actions']}  ({r['moves_per_sec']:.0f}/s; humanas {r['human_moves_per_sec']:.0f}/s)")
+    print(f"Latencia por jugada humana: p50 {lat['p50']:.1f} ms  p99 {lat['p99']:.1f} ms  máx {lat['max']:.1f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(r, f, indent=2)
+
+if __name__ == "__main__":
+    main()
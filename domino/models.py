@@ -1,6 +1,7 @@
 
+from collections import deque
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 
 Dom = Tuple[int, int]
 
@@ -22,3 +23,99 @@ def pip_sum(hand: List[Dom]) -> int:
 class Move:
     dom: Dom
     side: str  # 'L' o 'R' o 'OPEN' (solo en la primera jugada)
+
+class Chain:
+    """Mesa respaldada por un deque: inserción O(1) por ambos lados, extremos
+    cacheados (-1,-1 con la mesa vacía) y conteo por número de las fichas jugadas."""
+    __slots__ = ("tiles", "left", "right", "pip_counts")
+
+    def __init__(self, tiles: Iterable[Dom] = ()):
+        self.tiles = deque()
+        self.left = -1
+        self.right = -1
+        # pip_counts[p]: fichas en la mesa que contienen p (la mula cuenta una vez)
+        self.pip_counts = [0] * 7
+        for d in tiles:
+            self.append(d)
+
+    def _count(self, d: Dom):
+        a, b = d
+        self.pip_counts[a] += 1
+        if b != a:
+            self.pip_counts[b] += 1
+
+    def _uncount(self, d: Dom):
+        a, b = d
+        self.pip_counts[a] -= 1
+        if b != a:
+            self.pip_counts[b] -= 1
+
+    def appendleft(self, d: Dom):
+        """d ya orientada: d[1] debe coincidir con el extremo izquierdo."""
+        if not self.tiles:
+            self.right = d[1]
+        self.tiles.appendleft(d)
+        self.left = d[0]
+        self._count(d)
+
+    def append(self, d: Dom):
+        """d ya orientada: d[0] debe coincidir con el extremo derecho."""
+        if not self.tiles:
+            self.left = d[0]
+        self.tiles.append(d)
+        self.right = d[1]
+        self._count(d)
+
+    def popleft(self) -> Dom:
+        """Deshace appendleft: quita la ficha izquierda y restaura los extremos."""
+        d = self.tiles.popleft()
+        self._uncount(d)
+        if self.tiles:
+            self.left = self.tiles[0][0]
+        else:
+            self.left = self.right = -1
+        return d
+
+    def pop(self) -> Dom:
+        """Deshace append: quita la ficha derecha y restaura los extremos."""
+        d = self.tiles.pop()
+        self._uncount(d)
+        if self.tiles:
+            self.right = self.tiles[-1][1]
+        else:
+            self.left = self.right = -1
+        return d
+
+    def ends(self) -> Tuple[int, int]:
+        return (self.left, self.right)
+
+    def ends_after(self, mv: "Move") -> Tuple[int, int]:
+        """Extremos que quedarían tras jugar mv (ya orientada), sin copiar la mesa."""
+        a, b = mv.dom
+        if mv.side == "OPEN" or not self.tiles:
+            return (a, b)
+        if mv.side == "L":
+            return (a, self.right)
+        return (self.left, b)
+
+    def copy(self) -> "Chain":
+        c = Chain()
+        c.tiles = deque(self.tiles)
+        c.left, c.right = self.left, self.right
+        c.pip_counts = list(self.pip_counts)
+        return c
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def __iter__(self) -> Iterator[Dom]:
+        return iter(self.tiles)
+
+    def __getitem__(self, i: int) -> Dom:
+        return self.tiles[i]
+
+    def __eq__(self, other) -> bool:
+        return list(self.tiles) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self.tiles))
@@ -0,0 +1,165 @@
+"""Libro de aperturas: la mejor ficha de salida (mesa vacía, rondas que no son la primera)
+para cada una de las C(28,7) = 1.184.040 manos posibles.
+
+La tabla es un archivo de un byte por mano, indexado por el rango colex de la mano (ids de
+all_double6() ordenados): el índice de la ficha dentro de la mano ordenada, o UNKNOWN si
+aún no se calculó. Se lee con mmap (≈1,2 MB). El generador evalúa cada mano con
+pimc.pimc_search (mismos repartos para las 7 salidas), reparte bloques de manos en un pool
+de procesos y escribe cada bloque al terminar; si se interrumpe, volver a correrlo retoma
+los bloques que faltan.
+
+    python -m domino.opening build libro.bin --samples 32 --workers 8
+    python -m domino.opening info libro.bin"""
+import argparse
+import mmap
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+from typing import List, Optional, Sequence, Tuple
+
+from .belief import Belief
+from .bitboard import TILE_ID, TILES
+from .models import Dom, Move, all_double6
+from .pimc import pimc_search
+
+HAND = 7
+N_HANDS = comb(len(TILES), HAND)
+UNKNOWN = 255
+CHUNK = 4096
+
+# _BINOM[n][k] = C(n, k) para el rango colex
+_BINOM = [[comb(n, k) for k in range(HAND + 1)] for n in range(len(TILES) + 1)]
+
+def hand_rank(ids: Sequence[int]) -> int:
+    """Rango colex de 7 ids de ficha distintos y ordenados."""
+    return sum(_BINOM[t][k + 1] for k, t in enumerate(ids))
+
+def hand_unrank(r: int) -> List[int]:
+    """Inverso de hand_rank: los 7 ids ordenados."""
+    ids = [0] * HAND
+    c = len(TILES)
+    for k in range(HAND, 0, -1):
+        c -= 1
+        while _BINOM[c][k] > r:
+            c -= 1
+        ids[k - 1] = c
+        r -= _BINOM[c][k]
+    return ids
+
+def best_opening(hand: List[Dom], samples: int = 32, rollout: str = "greedy",
+                 rng: Optional[random.Random] = None) -> int:
+    """Índice (en la mano ordenada) de la salida con mejor margen medio para el equipo del
+    que abre, sobre `samples` repartos de las 21 fichas restantes."""
+    hand = sorted(hand)
+    b = Belief(players=4)
+    b.init_with(all_double6(), [hand, [], [], []], me=0)
+    moves = [Move(d, "OPEN") for d in hand]
+    _, avgs = pimc_search(0, moves, b, [HAND] * 4, (-1, -1), 0, 0, samples,
+                          rollout=rollout, rng=rng)
+    return max(range(len(moves)), key=avgs.__getitem__)
+
+def _solve_chunk(args) -> Tuple[int, bytes]:
+    start, end, samples, seed = args
+    rng = random.Random(f"{seed}:{start}")
+    out = bytearray()
+    for r in range(start, end):
+        out.append(best_opening([TILES[t] for t in hand_unrank(r)], samples, rng=rng))
+    return start, bytes(out)
+
+def _open_table(path: str):
+    """Crea el archivo (todo UNKNOWN) si no existe y lo mapea para escritura. ValueError si
+    existe y no tiene el tamaño de una tabla (no se sobrescribe)."""
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(bytes([UNKNOWN]) * N_HANDS)
+    elif os.path.getsize(path) != N_HANDS:
+        raise ValueError(f"{path}: tamaño {os.path.getsize(path)} != {N_HANDS}")
+    f = open(path, "r+b")
+    return f, mmap.mmap(f.fileno(), N_HANDS)
+
+def generate(path: str, samples: int = 32, workers: Optional[int] = None, seed: int = 0,
+             limit: Optional[int] = None, chunk: int = CHUNK, log=print) -> int:
+    """Calcula los bloques pendientes (con alguna mano UNKNOWN) de los primeros `limit`
+    rangos (todos por defecto). Devuelve cuántas manos se calcularon en esta corrida.
+    El resultado no depende del número de workers."""
+    workers = workers or os.cpu_count() or 1
+    total = N_HANDS if limit is None else min(limit, N_HANDS)
+    f, mm = _open_table(path)
+    done = 0
+    try:
+        jobs = [(s, min(s + chunk, total), samples, seed) for s in range(0, total, chunk)
+                if mm.find(bytes([UNKNOWN]), s, min(s + chunk, total)) != -1]
+        log(f"bloques pendientes: {len(jobs)} de {(total + chunk - 1) // chunk}")
+        t0 = time.perf_counter()
+        if workers <= 1:
+            stream = map(_solve_chunk, jobs)
+            ex = None
+        else:
+            ex = ProcessPoolExecutor(max_workers=workers)
+            stream = ex.map(_solve_chunk, jobs)
+        try:
+            for start, data in stream:
+                mm[start:start + len(data)] = data
+                mm.flush()
+                done += len(data)
+                rate = done / (time.perf_counter() - t0)
+                log(f"  {start + len(data)}/{total}  ({rate:.0f} manos/s)")
+        finally:
+            if ex is not None:
+                ex.shutdown(cancel_futures=True)
+    finally:
+        mm.close()
+        f.close()
+    return done
+
+class OpeningBook:
+    """Consulta del libro (solo lectura, mmap)."""
+    def __init__(self, path: str):
+        self.f = open(path, "rb")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mm) != N_HANDS:
+            self.close()
+            raise ValueError(f"{path}: tamaño {os.path.getsize(path)} != {N_HANDS}")
+
+    def lookup(self, hand: Sequence[Dom]) -> Optional[int]:
+        """Índice de la salida en la mano ordenada, o None si la mano no es de 7 fichas o
+        no está calculada."""
+        if len(hand) != HAND:
+            return None
+        v = self.mm[hand_rank(sorted(TILE_ID[d] for d in hand))]
+        return None if v == UNKNOWN else v
+
+    def move(self, hand: Sequence[Dom], moves: List[Move]) -> Optional[Move]:
+        """La jugada OPEN del libro entre `moves`, o None."""
+        i = self.lookup(hand)
+        if i is None:
+            return None
+        d = sorted(hand)[i]
+        return next((mv for mv in moves if mv.side == "OPEN" and mv.dom == d), None)
+
+    def coverage(self) -> int:
+        return N_HANDS - self.mm[:].count(bytes([UNKNOWN]))
+
+    def close(self):
+        self.mm.close()
+        self.f.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Libro de aperturas")
+    ap.add_argument("cmd", choices=("build", "info"))
+    ap.add_argument("path")
+    ap.add_argument("--samples", type=int, default=32, help="repartos por mano")
+    ap.add_argument("--workers", type=int, default=None, help="procesos (por defecto: núcleos)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--limit", type=int, default=None, help="solo los primeros N rangos")
+    args = ap.parse_args(argv)
+    if args.cmd == "build":
+        generate(args.path, args.samples, args.workers, args.seed, args.limit)
+    book = OpeningBook(args.path)
+    print(f"Manos calculadas: {book.coverage()} de {N_HANDS}")
+    book.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Búsqueda determinizada (PIMC): muestrea repartos ocultos consistentes con la creencia,
+juega cada jugada candidata hasta el final de la ronda y elige la de mejor promedio."""
+import random
+import time
+from typing import List, Optional, Tuple
+
+from .belief import Belief
+from .bitboard import BitState, PIP_MASK, TILE_PIPS, iter_bits
+from .models import Move
+
+def rollout_greedy(st: BitState, rng: random.Random):
+    """Cada jugador suelta su ficha más pesada (empate: menor id), por la izquierda si puede."""
+    while not st.round_over():
+        playable = st.playable_mask()
+        if not playable:
+            st.pass_turn()
+            continue
+        best = -1
+        best_pips = -1
+        for i in iter_bits(playable):
+            if TILE_PIPS[i] > best_pips:
+                best, best_pips = i, TILE_PIPS[i]
+        side = "L" if st.left < 0 or (PIP_MASK[st.left] >> best) & 1 else "R"
+        st.play_tile(best, side)
+
+def rollout_random(st: BitState, rng: random.Random):
+    """Jugadas legales al azar (lado al azar si la ficha entra por ambos)."""
+    while not st.round_over():
+        playable = st.playable_mask()
+        if not playable:
+            st.pass_turn()
+            continue
+        tiles = list(iter_bits(playable))
+        t = tiles[rng.randrange(len(tiles))]
+        if st.left < 0:
+            st.play_tile(t, "L")
+            continue
+        canL = (PIP_MASK[st.left] >> t) & 1
+        canR = (PIP_MASK[st.right] >> t) & 1
+        if canL and canR:
+            st.play_tile(t, "L" if rng.random() < 0.5 else "R")
+        else:
+            st.play_tile(t, "L" if canL else "R")
+
+ROLLOUTS = {"greedy": rollout_greedy, "random": rollout_random}
+
+def margin(st: BitState, pid: int) -> int:
+    """Puntos de la ronda a favor del equipo de pid menos los del rival."""
+    a, b = st.round_points()
+    return a - b if pid % 2 == 0 else b - a
+
+def pimc_search(pid: int, moves: List[Move], belief: Belief, hands_sizes: List[int],
+                ends: Tuple[int, int], length: int, passes_in_row: int,
+                samples: int = 64, time_budget: Optional[float] = None,
+                rollout: str = "greedy", rng: Optional[random.Random] = None) -> Tuple[Move, List[float]]:
+    """Evalúa cada jugada sobre los mismos repartos muestreados (hasta `samples` o hasta
+    agotar `time_budget` segundos, al menos uno). Devuelve (mejor jugada, promedios)."""
+    rng = rng or random.Random()
+    play_out = ROLLOUTS[rollout]
+    totals = [0.0] * len(moves)
+    L, R = ends
+    base = BitState([0, 0, 0, 0], L, R, length, pid, passes_in_row)
+    st = BitState([0, 0, 0, 0])
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    done = 0
+    while done < samples:
+        base.hands[:] = belief.sample_masks(hands_sizes, rng)
+        for i, mv in enumerate(moves):
+            st.load(base)
+            st.play(mv)
+            play_out(st, rng)
+            totals[i] += margin(st, pid)
+        done += 1
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+    avgs = [t / done for t in totals]
+    best = max(range(len(moves)), key=avgs.__getitem__)
+    return moves[best], avgs
+
+class PIMCPlayer:
+    """Bot para Game.bots: ve solo su mano y lo público (Game.belief_for)."""
+    def __init__(self, samples: int = 64, time_budget: Optional[float] = None,
+                 rollout: str = "greedy", rng: Optional[random.Random] = None):
+        if rollout not in ROLLOUTS:
+            raise ValueError(f"rollout desconocido: {rollout}")
+        self.samples = samples
+        self.time_budget = time_budget
+        self.rollout = rollout
+        self.rng = rng or random.Random()
+
+    def choose(self, g, pid: int) -> Move:
+        moves = g.legal_moves()
+        if len(moves) == 1:
+            return moves[0]
+        mv, _ = pimc_search(pid, moves, g.belief_for(pid), g.hands_sizes(), g.ends(),
+                            len(g.chain), g.passes_in_row, self.samples, self.time_budget,
+                            self.rollout, self.rng)
+        return mv
@@ -1,8 +1,11 @@
 import pygame
+from collections import OrderedDict
 from .game import Game
-from .rules import legal_moves, apply_move
+from .rules import legal_moves
 from .models import normalize
 from .ai import estimate_play_prob
+from .pimc import PIMCPlayer
+from .ai_worker import MoveService
 
 WHITE = (240,240,240)
 BG = (20,22,26)
@@ -17,21 +20,42 @@ DARK = (45,50,58)
 TILE_W, TILE_H = 72, 40
 RENDER_NUMBERS = True   # alterna con tecla N
 AI_DELAY_MS = 3000      # ms entre jugadas de bots
+STRONG_AI_BUDGET = 0.5  # s de búsqueda PIMC por jugada en modo IA FUERTE
+TEXT_CACHE_SIZE = 256  # textos renderizados que se conservan (LRU)
+EVENT_DRIVEN_RENDER = True  # redibuja solo si algo cambió y sube solo las regiones sucias
+IDLE_WAIT_MS = 250     # espera máxima por eventos sin nada que hacer
+AI_DONE = pygame.USEREVENT + 1  # el servicio de jugadas terminó una decisión
 
 # -------------------------------------------------
 # util
 # -------------------------------------------------
-def remove_from_hand_norm(hand, dom):
-    tgt = normalize(dom)
-    for i, d in enumerate(hand):
-        if normalize(d) == tgt:
-            del hand[i]
-            return True
-    return False
+# registro de fuentes: (nombre, tamaño, negrita) -> Font
+_FONTS = {}
+# textos ya renderizados: (texto, tamaño, color, negrita, fuente) -> Surface, LRU acotado
+_TEXT_CACHE = OrderedDict()
+
+def get_font(font_name='consolas', size=24, bold=True):
+    key = (font_name, size, bold)
+    font = _FONTS.get(key)
+    if font is None:
+        font = _FONTS[key] = pygame.font.SysFont(font_name, size, bold=bold)
+    return font
+
+def text_surface(txt, size=24, color=WHITE, font_name='consolas', bold=True):
+    """Superficie del texto desde la caché; solo rasteriza si no está."""
+    key = (str(txt), size, tuple(color), bold, font_name)
+    img = _TEXT_CACHE.get(key)
+    if img is not None:
+        _TEXT_CACHE.move_to_end(key)
+        return img
+    img = get_font(font_name, size, bold).render(key[0], True, color)
+    _TEXT_CACHE[key] = img
+    if len(_TEXT_CACHE) > TEXT_CACHE_SIZE:
+        _TEXT_CACHE.popitem(last=False)
+    return img
 
 def text(surf, txt, x, y, size=24, color=WHITE, font_name='consolas', center=False, bold=True):
-    font = pygame.font.SysFont(font_name, size, bold=bold)
-    img = font.render(str(txt), True, color)
+    img = text_surface(txt, size, color, font_name, bold)
     rect = img.get_rect()
     if center:
         rect.center = (x, y)
@@ -42,10 +66,48 @@ def text(surf, txt, x, y, size=24, color=WHITE, font_name='consolas', center=Fal
 # -------------------------------------------------
 # dibujo de fichas
 # -------------------------------------------------
+# atlas de fichas ya dibujadas: (dom, w, h, rotate90, números, color) -> Surface
+_TILE_ATLAS = {}
+
+def clear_tile_atlas():
+    """Vacía el atlas (p. ej. al alternar RENDER_NUMBERS con N)."""
+    _TILE_ATLAS.clear()
+
+def warm_tile_atlas(w=TILE_W, h=TILE_H, color=(60,60,60)):
+    """Pre-dibuja las 49 orientaciones de ficha al tamaño dado (mulas también en vertical)."""
+    for a in range(7):
+        for b in range(7):
+            tile_surface((a, b), w, h, color, False)
+            if a == b:
+                tile_surface((a, b), w, h, color, True)
+
+def tile_surface(dom, w=TILE_W, h=TILE_H, color=(60,60,60), rotate90=False):
+    """Superficie de la ficha desde el atlas; la dibuja la primera vez que se pide."""
+    key = (tuple(dom), w, h, rotate90, RENDER_NUMBERS, tuple(color))
+    tile = _TILE_ATLAS.get(key)
+    if tile is None:
+        tile = render_tile(dom, w, h, color, rotate90)
+        if pygame.display.get_surface() is not None:
+            tile = tile.convert_alpha()
+        _TILE_ATLAS[key] = tile
+    return tile
+
 def draw_tile(surf, dom, x, y, w=TILE_W, h=TILE_H, color=(60,60,60), rotate90=False):
     """
     Dibuja una ficha horizontal por defecto. Si rotate90=True, la rota 90° (vertical).
-    Se dibuja en una superficie temporal y luego se centra en el slot (x,y,w,h).
+    Un solo blit desde el atlas, centrado en el slot (x,y,w,h).
+    """
+    tile = tile_surface(dom, w, h, color, rotate90)
+    if rotate90:
+        rect = tile.get_rect(center=(x + w // 2, y + h // 2))
+    else:
+        rect = tile.get_rect(topleft=(x, y))
+    surf.blit(tile, rect)
+
+def render_tile(dom, w=TILE_W, h=TILE_H, color=(60,60,60), rotate90=False):
+    """
+    Dibuja la ficha en una superficie nueva (horizontal, o vertical si rotate90=True)
+    según el modo actual (RENDER_NUMBERS). La usa el atlas; no llamar por frame.
     """
     a, b = dom
 
@@ -55,7 +117,7 @@ def draw_tile(surf, dom, x, y, w=TILE_W, h=TILE_H, color=(60,60,60), rotate90=Fa
     pygame.draw.line(tile, WHITE, (w // 2, 5), (w // 2, h - 5), 2)  # divisor
 
     if RENDER_NUMBERS:
-        font = pygame.font.SysFont('consolas', max(14, h // 2), bold=True)
+        font = get_font('consolas', max(14, h // 2), True)
         la = font.render(str(a), True, WHITE)
         lb = font.render(str(b), True, WHITE)
         ra = la.get_rect(center=(w // 4, h // 2))
@@ -97,13 +159,9 @@ def draw_tile(surf, dom, x, y, w=TILE_W, h=TILE_H, color=(60,60,60), rotate90=Fa
         draw_side(b, right_rect)
         tile.set_clip(prev_clip)
 
-    # rotación y blit centrado en el slot
     if rotate90:
         tile = pygame.transform.rotate(tile, 90)
-        rect = tile.get_rect(center=(x + w // 2, y + h // 2))
-    else:
-        rect = tile.get_rect(topleft=(x, y))
-    surf.blit(tile, rect)
+    return tile
 
 def draw_back_tile(surf, x, y, w=TILE_W, h=TILE_H, color=(55,60,70)):
     pygame.draw.rect(surf, color, (x, y, w, h), border_radius=7)
@@ -173,21 +231,68 @@ def main():
     screen = pygame.display.set_mode((W,H))
     pygame.display.set_caption("Dominó 2v2 — Menú + Entrenamiento + Drag & Drop (Mesa)")
     clock = pygame.time.Clock()
+    warm_tile_atlas()
 
     in_menu = True
     training_mode = False
     btn_normal = pygame.Rect(W//2-160, H//2-40, 320, 40)
     btn_training = pygame.Rect(W//2-160, H//2+20, 320, 40)
+    btn_strong = pygame.Rect(W//2-160, H//2+80, 320, 40)
 
     g = Game(); g.reset_scores()
     history = []; last_round_points = (0,0)
 
+    # regiones de pantalla para el render por regiones sucias
+    R_HUD = pygame.Rect(0, 0, W, 160)
+    R_HIST = pygame.Rect(W-300, 90, 300, H-90)
+    R_TABLE = pygame.Rect(0, 90, W-300+20, 450)
+    R_HAND = pygame.Rect(0, 530, W-300, H-530)
+    dirty = []; full_redraw = True
+
+    def invalidate(*rects):
+        """Marca regiones a redibujar; sin argumentos, la pantalla completa."""
+        nonlocal full_redraw
+        if rects:
+            dirty.extend(rects)
+        else:
+            full_redraw = True
+
+    # valores derivados del estado (jugadas del humano, probabilidades de entrenamiento),
+    # recalculados solo cuando cambia state_version
+    state_version = 0
+    view = {"version": -1}
+
+    def state_changed():
+        nonlocal state_version
+        state_version += 1
+        invalidate(R_HUD, R_TABLE, R_HAND)
+
+    def human_moves():
+        if view["version"] != state_version:
+            view["version"] = state_version
+            view["moves"] = legal_moves(g.chain, g.hands[0])
+            view["probs"] = None
+        return view["moves"]
+
+    def training_probs():
+        human_moves()
+        if view["probs"] is None:
+            L,R = g.ends()
+            opp = 1
+            view["probs"] = (estimate_play_prob(L, opp, g.belief, g.hands_sizes()),
+                             estimate_play_prob(R, opp, g.belief, g.hands_sizes()))
+        return view["probs"]
+
     def play_new_round():
         nonlocal last_round_points
         g.deal_round()
         last_round_points = (0,0)
+        state_changed()   # mesa, manos y HUD (donde estaban los avisos de fin de ronda)
         schedule_ai_if_needed()
 
+    def drag_rect():
+        return pygame.Rect(drag_pos[0], drag_pos[1], TILE_W, TILE_H)
+
     selected = None; dragging = False; drag_offset = (0,0); drag_pos = (0,0)
     show_next_round_btn = False; match_over_prompt = False
 
@@ -196,29 +301,66 @@ def main():
     dropR = pygame.Rect(W//2 + 80, 540, 190, 40)
     btn_pass = pygame.Rect(W//2 - 70, 590, 140, 34)
 
-    # temporizador bots
+    # temporizador bots: la jugada se calcula en segundo plano y se aplica cuando pasaron
+    # AI_DELAY_MS y además el resultado está listo
     ai_waiting = False
     ai_next_time = 0
+    ai_future = None; ai_version = -1
+    # heurística: barata, en un hilo; PIMC (IA FUERTE) ocupa la CPU y con el GIL trabaría el
+    # dibujo, así que va a un proceso aparte (se crea la primera vez que se elige)
+    service = MoveService()
+    search_service = None
+    ai_service = service
+
+    def notify_ai_done(_future):
+        try:
+            pygame.event.post(pygame.event.Event(AI_DONE))
+        except pygame.error:
+            pass   # ya se cerró pygame
 
     def schedule_ai_if_needed():
-        nonlocal ai_waiting, ai_next_time
+        nonlocal ai_waiting, ai_next_time, ai_future, ai_version
         if g.current != 0 and not g.round_over():
             ai_waiting = True
             ai_next_time = pygame.time.get_ticks() + AI_DELAY_MS
+            ai_version = state_version
+            ai_future = ai_service.submit(g)
+            ai_future.add_done_callback(notify_ai_done)
 
     running = True
     while running:
-        for e in pygame.event.get():
+        events = pygame.event.get()
+        if EVENT_DRIVEN_RENDER and not events and not (full_redraw or dirty):
+            # nada pendiente: dormir hasta el próximo evento o el turno del bot
+            timeout = IDLE_WAIT_MS
+            if ai_waiting and ai_next_time > pygame.time.get_ticks():
+                timeout = min(timeout, ai_next_time - pygame.time.get_ticks())
+            e = pygame.event.wait(timeout)
+            if e.type != pygame.NOEVENT:
+                events = [e] + pygame.event.get()
+        for e in events:
             if e.type == pygame.QUIT:
                 running = False
+            if e.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                invalidate()
 
             if in_menu:
                 if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
+                    invalidate()
                     mx,my = e.pos
                     if btn_normal.collidepoint(mx,my):
+                        g.bots = [None]*4; ai_service = service
                         training_mode = False; in_menu=False; play_new_round()
                     if btn_training.collidepoint(mx,my):
+                        g.bots = [None]*4; ai_service = service
                         training_mode = True; in_menu=False; play_new_round()
+                    if btn_strong.collidepoint(mx,my):
+                        strong = PIMCPlayer(samples=10**6, time_budget=STRONG_AI_BUDGET)
+                        g.bots = [None, strong, strong, strong]
+                        if search_service is None:
+                            search_service = MoveService(processes=True)
+                        ai_service = search_service
+                        training_mode = False; in_menu=False; play_new_round()
                 if e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:
                     running = False
                 continue
@@ -226,16 +368,22 @@ def main():
             if e.type == pygame.KEYDOWN:
                 if e.key == pygame.K_t:
                     training_mode = not training_mode
+                    invalidate(R_HAND)
                 if e.key == pygame.K_n:
                     global RENDER_NUMBERS
                     RENDER_NUMBERS = not RENDER_NUMBERS
+                    clear_tile_atlas(); warm_tile_atlas()
+                    invalidate()
                 if e.key == pygame.K_ESCAPE:
                     in_menu = True; selected=None; dragging=False
                     ai_waiting = False
+                    invalidate()
                     continue
 
             if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
                 mx,my = e.pos
+                if show_next_round_btn or match_over_prompt:
+                    invalidate()
                 if show_next_round_btn:
                     if 20 <= mx <= 200 and 80 <= my <= 110:
                         show_next_round_btn = False; match_over_prompt=False; play_new_round(); selected=None; dragging=False
@@ -244,20 +392,16 @@ def main():
                     continue
                 if match_over_prompt:
                     if 20 <= mx <= 240 and 120 <= my <= 150:
-                        g.reset_scores(); history.clear(); show_next_round_btn=False; match_over_prompt=False; play_new_round(); selected=None; dragging=False
+                        g.reset_scores(); history.clear(); invalidate(R_HIST); show_next_round_btn=False; match_over_prompt=False; play_new_round(); selected=None; dragging=False
                     if 260 <= mx <= 400 and 120 <= my <= 150:
                         running = False
                     continue
 
                 # PASAR (solo si no hay jugadas)
                 if btn_pass.collidepoint(mx,my) and g.current == 0 and not g.round_over():
-                    moves = legal_moves(g.chain, g.hands[0])
-                    if not moves:
-                        L,R = g.ends()
-                        if L != -1:
-                            g.belief.mark_pass(0, L, R)
-                        g.passes_in_row += 1
-                        g.current = (g.current + 1) % 4
+                    if not human_moves():
+                        g.pass_turn()
+                        state_changed()
                         schedule_ai_if_needed()
                     continue
 
@@ -267,32 +411,36 @@ def main():
                     x = 20 + i*(TILE_W+8)
                     rect = pygame.Rect(x, base_y, TILE_W, TILE_H)
                     if rect.collidepoint(mx,my):
-                        if not legal_moves(g.chain, g.hands[0]) and g.chain:
+                        if not human_moves() and g.chain:
                             break
                         selected = d; dragging=True
                         drag_offset = (mx - x, my - base_y); drag_pos=(x, base_y)
+                        invalidate(R_HAND, drag_rect())
                         break
 
             if e.type == pygame.MOUSEMOTION and dragging:
+                old = drag_rect()
                 mx,my = e.pos; drag_pos = (mx - drag_offset[0], my - drag_offset[1])
+                invalidate(old, drag_rect())
 
             if e.type == pygame.MOUSEBUTTONUP and e.button == 1 and dragging:
                 mx,my = e.pos
                 if not (show_next_round_btn or match_over_prompt):
-                    legal = [(mv.side, mv) for mv in legal_moves(g.chain, g.hands[0]) if normalize(mv.dom)==normalize(selected)]
+                    legal = [(mv.side, mv) for mv in human_moves() if normalize(mv.dom)==normalize(selected)]
                     sides = {s for s,_ in legal}
                     if dropL.collidepoint(mx,my) and ('L' in sides or 'OPEN' in sides):
                         mv = next((m for s,m in legal if s in ('L','OPEN')), None)
                         if mv:
-                            g.chain = apply_move(g.chain, mv); remove_from_hand_norm(g.hands[0], mv.dom)
-                            g.belief.mark_played(mv.dom, 0); g.passes_in_row = 0; g.current = (g.current + 1) % 4
+                            g.play_move(mv)
+                            state_changed()
                             schedule_ai_if_needed()
                     elif dropR.collidepoint(mx,my) and ('R' in sides or 'OPEN' in sides):
                         mv = next((m for s,m in legal if s in ('R','OPEN')), None)
                         if mv:
-                            g.chain = apply_move(g.chain, mv); remove_from_hand_norm(g.hands[0], mv.dom)
-                            g.belief.mark_played(mv.dom, 0); g.passes_in_row = 0; g.current = (g.current + 1) % 4
+                            g.play_move(mv)
+                            state_changed()
                             schedule_ai_if_needed()
+                invalidate(R_HAND, drag_rect())
                 dragging=False; selected=None
 
         # ================= Update =================
@@ -301,13 +449,15 @@ def main():
             if (g.current != 0 and not g.round_over() and not show_next_round_btn and not match_over_prompt):
                 if not ai_waiting:
                     schedule_ai_if_needed()
-                if ai_waiting and now >= ai_next_time:
-                    g.step_ai()  # una jugada
-                    if g.current != 0 and not g.round_over():
-                        ai_next_time = now + AI_DELAY_MS
-                        ai_waiting = True
+                if ai_waiting and now >= ai_next_time and ai_future.done():
+                    mv = ai_future.result(); ai_future = None
+                    if ai_version != state_version:
+                        ai_waiting = False   # el estado cambió mientras pensaba: se vuelve a pedir
                     else:
+                        g.apply_ai(mv)  # una jugada
+                        state_changed()
                         ai_waiting = False
+                        schedule_ai_if_needed()
 
             if g.round_over() and not show_next_round_btn and not match_over_prompt:
                 a,b = g.round_score()
@@ -317,10 +467,18 @@ def main():
                 history[:] = history[:10]
                 show_next_round_btn = True
                 ai_waiting = False
+                # historial nuevo; avisos sobre el HUD y la mesa; sin zonas de drop en la mano
+                invalidate(R_HUD, R_HIST, R_TABLE, R_HAND)
                 if g.scores[0] >= 100 or g.scores[1] >= 100:
                     match_over_prompt = True
 
         # ================= Render =================
+        if EVENT_DRIVEN_RENDER and not (full_redraw or dirty):
+            clock.tick(60); continue
+        # cuadro parcial: se dibuja recortado a la unión de las regiones sucias y se saltan
+        # las secciones que no la tocan (cada sección dibuja solo dentro de su región)
+        clip = None if (full_redraw or not EVENT_DRIVEN_RENDER or in_menu) else dirty[0].unionall(dirty[1:])
+        screen.set_clip(clip)
         screen.fill(BG)
 
         if in_menu:
@@ -330,97 +488,101 @@ def main():
             pygame.draw.rect(screen, BTN, btn_training, border_radius=10)
             text(screen, "Jugar NORMAL", btn_normal.centerx, btn_normal.centery, 22, WHITE, center=True)
             text(screen, "Jugar MODO ENTRENAMIENTO", btn_training.centerx, btn_training.centery, 22, WHITE, center=True)
+            pygame.draw.rect(screen, BTN, btn_strong, border_radius=10)
+            text(screen, "Jugar vs IA FUERTE", btn_strong.centerx, btn_strong.centery, 22, WHITE, center=True)
             text(screen, "Tip: T alterna entrenamiento, N alterna puntos/números", W//2, H-60, 18, GREY, center=True, bold=False)
-            pygame.display.flip(); clock.tick(60); continue
-
-        pygame.draw.rect(screen, PANEL, (0,0,W,90))
-        text(screen, "Equipo A", 30, 12, 22, ACCENT_A)
-        text(screen, f"{g.scores[0]}", 30, 38, 36, ACCENT_A)
-        text(screen, "Equipo B", W-170, 12, 22, ACCENT_B)
-        text(screen, f"{g.scores[1]}", W-90, 38, 36, ACCENT_B)
-        text(screen, 'Modo: ' + ('NÚMEROS' if RENDER_NUMBERS else 'PUNTOS'), 200, 12, 18, WHITE, bold=False)
-        center_txt = f"Turno: J{g.current}  |  Manos: {[len(h) for h in g.hands]}  |  Pases: {g.passes_in_row}"
-        text(screen, center_txt, W//2, 45, 22, WHITE, center=True, bold=False)
-
-        pygame.draw.rect(screen, PANEL, (W-300, 90, 300, H-90))
-        text(screen, "Historial", W-280, 100, 22, WHITE)
-        y_hist = 130
-        for line in history:
-            text(screen, line, W-290, y_hist, 18, WHITE, bold=False)
-            y_hist += 22
-
-        pygame.draw.rect(screen, DARK, tbl_rect, border_radius=12)
-        pos = layout_chain_positions(g.chain, tbl_rect)
-
-# Ya NO necesitamos prev_right: la cadena está orientada por reglas.
-        for (x, y, row_parity), (a, b) in zip(pos, g.chain):
-    # En filas impares (der→izq) mostramos el dom volteado
-            dom_view = (b, a) if row_parity == 1 else (a, b)
-            rotate90 = (a == b)  # mulas verticales
-            draw_tile(screen, dom_view, x, y, rotate90=rotate90)
-        if g.chain:
-            text(screen, f"Extremos: {g.ends()}", tbl_rect.x+10, tbl_rect.y-28, 22, WHITE, bold=False)
-
-        # Oponentes
-        top_y = tbl_rect.y - 60
-        for i in range(len(g.hands[2])):
-            draw_back_tile(screen, 40 + i*24, top_y, TILE_W-28, TILE_H-18)
-        text(screen, f"J2 ({len(g.hands[2])})", 40 + len(g.hands[2])*24 + 10, top_y-2, 18, ACCENT_A, bold=False)
-
-        right_x = tbl_rect.x + tbl_rect.width + 10
-        for i in range(len(g.hands[1])):
-            draw_back_tile(screen, right_x, 160 + i*22, TILE_W-28, TILE_H-18)
-        text(screen, f"J1 ({len(g.hands[1])})", right_x, 140, 18, ACCENT_B, bold=False)
-
-        left_x = 10
-        for i in range(len(g.hands[3])):
-            draw_back_tile(screen, left_x, 160 + i*22, TILE_W-28, TILE_H-18)
-        text(screen, f"J3 ({len(g.hands[3])})", left_x, 140, 18, ACCENT_B, bold=False)
-
-        # Mano del jugador
-        base_y = H-110
-        for i, d in enumerate(g.hands[0]):
-            if dragging and d == selected:
-                continue
-            draw_tile(screen, d, 20 + i*(TILE_W+8), base_y)
-
-        # Zonas de drop + entrenamiento
-        if not (show_next_round_btn or match_over_prompt):
-            moves = legal_moves(g.chain, g.hands[0])
-            can_play_any = len(moves) > 0
-
-            canL = canR = False
-            pL = pR = None
-            if training_mode and g.chain:
-                L,R = g.ends()
-                opp = 1
-                pL = estimate_play_prob(L, opp, g.belief, g.hands_sizes())
-                pR = estimate_play_prob(R, opp, g.belief, g.hands_sizes())
-
-            if dragging and selected:
-                legal = [(mv.side, mv) for mv in moves if normalize(mv.dom)==normalize(selected)]
-                sides = {s for s,_ in legal}
-                canL = ('L' in sides) or ('OPEN' in sides)
-                canR = ('R' in sides) or ('OPEN' in sides)
-
-            pygame.draw.rect(screen, (60,60,60), dropL, border_radius=8)
-            pygame.draw.rect(screen, (60,60,60), dropR, border_radius=8)
-            if canL: pygame.draw.rect(screen, HL, dropL, width=3, border_radius=8)
-            if canR: pygame.draw.rect(screen, HL, dropR, width=3, border_radius=8)
-            lblL = "Soltar a la IZQUIERDA"
-            lblR = "Soltar a la DERECHA"
-            if training_mode and pL is not None and pR is not None:
-                lblL += f"  (Rival puede: {int(pL*100)}%)"
-                lblR += f"  (Rival puede: {int(pR*100)}%)"
-            text(screen, lblL, dropL.centerx, dropL.centery-10, 18, WHITE, center=True, bold=False)
-            text(screen, lblR, dropR.centerx, dropR.centery-10, 18, WHITE, center=True, bold=False)
-
-            if g.current == 0:
-                color = BTN if not can_play_any else (80,80,80)
-                pygame.draw.rect(screen, color, btn_pass, border_radius=8)
-                text(screen, "PASAR", btn_pass.centerx, btn_pass.centery-6, 20, WHITE, center=True, bold=True)
-                hint = "(sin jugadas)" if not can_play_any else "(tienes jugadas)"
-                text(screen, hint, btn_pass.centerx, btn_pass.centery+12, 14, (160,160,160), center=True, bold=False)
+            pygame.display.flip(); dirty.clear(); full_redraw = False
+            clock.tick(60); continue
+
+        if clip is None or clip.colliderect(R_HUD):
+            pygame.draw.rect(screen, PANEL, (0,0,W,90))
+            text(screen, "Equipo A", 30, 12, 22, ACCENT_A)
+            text(screen, f"{g.scores[0]}", 30, 38, 36, ACCENT_A)
+            text(screen, "Equipo B", W-170, 12, 22, ACCENT_B)
+            text(screen, f"{g.scores[1]}", W-90, 38, 36, ACCENT_B)
+            text(screen, 'Modo: ' + ('NÚMEROS' if RENDER_NUMBERS else 'PUNTOS'), 200, 12, 18, WHITE, bold=False)
+            center_txt = f"Turno: J{g.current}  |  Manos: {[len(h) for h in g.hands]}  |  Pases: {g.passes_in_row}"
+            text(screen, center_txt, W//2, 45, 22, WHITE, center=True, bold=False)
+
+        if clip is None or clip.colliderect(R_HIST):
+            pygame.draw.rect(screen, PANEL, (W-300, 90, 300, H-90))
+            text(screen, "Historial", W-280, 100, 22, WHITE)
+            y_hist = 130
+            for line in history:
+                text(screen, line, W-290, y_hist, 18, WHITE, bold=False)
+                y_hist += 22
+
+        if clip is None or clip.colliderect(R_TABLE):
+            pygame.draw.rect(screen, DARK, tbl_rect, border_radius=12)
+            pos = layout_chain_positions(g.chain, tbl_rect)
+
+            # Ya NO necesitamos prev_right: la cadena está orientada por reglas.
+            for (x, y, row_parity), (a, b) in zip(pos, g.chain):
+                # En filas impares (der→izq) mostramos el dom volteado
+                dom_view = (b, a) if row_parity == 1 else (a, b)
+                rotate90 = (a == b)  # mulas verticales
+                draw_tile(screen, dom_view, x, y, rotate90=rotate90)
+            if g.chain:
+                text(screen, f"Extremos: {g.ends()}", tbl_rect.x+10, tbl_rect.y-28, 22, WHITE, bold=False)
+
+            # Oponentes
+            top_y = tbl_rect.y - 60
+            for i in range(len(g.hands[2])):
+                draw_back_tile(screen, 40 + i*24, top_y, TILE_W-28, TILE_H-18)
+            text(screen, f"J2 ({len(g.hands[2])})", 40 + len(g.hands[2])*24 + 10, top_y-2, 18, ACCENT_A, bold=False)
+
+            right_x = tbl_rect.x + tbl_rect.width + 10
+            for i in range(len(g.hands[1])):
+                draw_back_tile(screen, right_x, 160 + i*22, TILE_W-28, TILE_H-18)
+            text(screen, f"J1 ({len(g.hands[1])})", right_x, 140, 18, ACCENT_B, bold=False)
+
+            left_x = 10
+            for i in range(len(g.hands[3])):
+                draw_back_tile(screen, left_x, 160 + i*22, TILE_W-28, TILE_H-18)
+            text(screen, f"J3 ({len(g.hands[3])})", left_x, 140, 18, ACCENT_B, bold=False)
+
+        if clip is None or clip.colliderect(R_HAND):
+            # Mano del jugador
+            base_y = H-110
+            for i, d in enumerate(g.hands[0]):
+                if dragging and d == selected:
+                    continue
+                draw_tile(screen, d, 20 + i*(TILE_W+8), base_y)
+
+            # Zonas de drop + entrenamiento
+            if not (show_next_round_btn or match_over_prompt):
+                moves = human_moves()
+                can_play_any = len(moves) > 0
+
+                canL = canR = False
+                pL = pR = None
+                if training_mode and g.chain:
+                    pL, pR = training_probs()
+
+                if dragging and selected:
+                    legal = [(mv.side, mv) for mv in moves if normalize(mv.dom)==normalize(selected)]
+                    sides = {s for s,_ in legal}
+                    canL = ('L' in sides) or ('OPEN' in sides)
+                    canR = ('R' in sides) or ('OPEN' in sides)
+
+                pygame.draw.rect(screen, (60,60,60), dropL, border_radius=8)
+                pygame.draw.rect(screen, (60,60,60), dropR, border_radius=8)
+                if canL: pygame.draw.rect(screen, HL, dropL, width=3, border_radius=8)
+                if canR: pygame.draw.rect(screen, HL, dropR, width=3, border_radius=8)
+                lblL = "Soltar a la IZQUIERDA"
+                lblR = "Soltar a la DERECHA"
+                if training_mode and pL is not None and pR is not None:
+                    lblL += f"  (Rival puede: {int(pL*100)}%)"
+                    lblR += f"  (Rival puede: {int(pR*100)}%)"
+                text(screen, lblL, dropL.centerx, dropL.centery-10, 18, WHITE, center=True, bold=False)
+                text(screen, lblR, dropR.centerx, dropR.centery-10, 18, WHITE, center=True, bold=False)
+
+                if g.current == 0:
+                    color = BTN if not can_play_any else (80,80,80)
+                    pygame.draw.rect(screen, color, btn_pass, border_radius=8)
+                    text(screen, "PASAR", btn_pass.centerx, btn_pass.centery-6, 20, WHITE, center=True, bold=True)
+                    hint = "(sin jugadas)" if not can_play_any else "(tienes jugadas)"
+                    text(screen, hint, btn_pass.centerx, btn_pass.centery+12, 14, (160,160,160), center=True, bold=False)
 
         if dragging and selected:
             draw_tile(screen, selected, drag_pos[0], drag_pos[1])
@@ -435,9 +597,17 @@ def main():
             pygame.draw.rect(screen, BTN, (20,120,220,30), border_radius=8); text(screen, "Sí (nueva partida)", 30, 126, 22)
             pygame.draw.rect(screen, BTN, (260,120,140,30), border_radius=8); text(screen, "No (salir)", 270, 126, 22)
 
-        pygame.display.flip()
+        screen.set_clip(None)
+        if full_redraw or not EVENT_DRIVEN_RENDER:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        dirty.clear(); full_redraw = False
         clock.tick(60)
 
+    service.shutdown()
+    if search_service is not None:
+        search_service.shutdown()
     pygame.quit()
 
 if __name__ == "__main__":
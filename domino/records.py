@@ -0,0 +1,226 @@
+"""Registro binario compacto de rondas.
+
+Archivo: cabecera MAGIC (5 bytes) y luego registros de largo variable, solo por anexado:
+
+    semilla del reparto  u64   (Game.deal_round(seed))
+    banderas             u8    bit 2: primera ronda (abre el doble más alto);
+                               bits 0-1: quién abre si no es la primera
+    puntos A, puntos B   u8 u8 (Game.round_score)
+    n                    u8    número de acciones
+    acciones             n x u8: id de ficha * 3 + lado (L=0, R=1, OPEN=2); PASS = 255
+
+La salida forzada con el doble de la primera ronda no se guarda: deal_round la juega sola.
+El lector usa mmap y no carga el archivo en memoria. Un archivo sin cabecera completa es un
+error (ValueError); un registro cortado al final (escritura interrumpida) se ignora y se
+informa en RecordReader.truncated."""
+import argparse
+import mmap
+import os
+import struct
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .bitboard import TILE_ID
+from .game import Game
+from .models import Move
+
+MAGIC = b"DOMR\x01"
+HEADER = struct.Struct("<QBBBB")
+SIDES = ("L", "R", "OPEN")
+SIDE_CODE = {s: i for i, s in enumerate(SIDES)}
+PASS = 255
+FIRST_ROUND = 4
+
+def encode_action(mv: Optional[Move]) -> int:
+    if mv is None:
+        return PASS
+    return TILE_ID[mv.dom] * 3 + SIDE_CODE[mv.side]
+
+def decode_action(code: int) -> Optional[Tuple[int, str]]:
+    """(id de ficha, lado) o None = pasar."""
+    if code == PASS:
+        return None
+    return code // 3, SIDES[code % 3]
+
+class Record(NamedTuple):
+    seed: int
+    first_round: bool
+    starter: int
+    points: Tuple[int, int]
+    actions: bytes
+
+    @property
+    def blocked(self) -> bool:
+        """La ronda terminó por cuatro pases seguidos."""
+        return self.actions[-4:] == bytes([PASS] * 4)
+
+def encode_record(seed: int, first_round: bool, starter: int, points: Tuple[int, int],
+                  actions: bytes) -> bytes:
+    flags = (FIRST_ROUND if first_round else 0) | (starter & 3)
+    return HEADER.pack(seed, flags, points[0], points[1], len(actions)) + actions
+
+class RoundRecorder:
+    """Arma el registro de la ronda en curso de un Game: begin() antes de deal_round
+    (guarda quién abre), finish(seed, puntos) después de round_score."""
+    def __init__(self):
+        self.first_round = True
+        self.starter = 0
+
+    def begin(self, g: Game):
+        self.first_round = g.first_round
+        self.starter = g.next_starter or 0
+
+    def finish(self, g: Game, seed: int, points: Tuple[int, int]) -> bytes:
+        log = g.log[1:] if self.first_round else g.log
+        actions = bytes(encode_action(mv) for _who, mv, _L, _R in log)
+        return encode_record(seed, self.first_round, self.starter, points, actions)
+
+class RecordWriter:
+    """Escritura por anexado (con búfer); escribe la cabecera si el archivo es nuevo."""
+    def __init__(self, path: str):
+        self.f = open(path, "ab")
+        if self.f.tell() == 0:
+            self.f.write(MAGIC)
+
+    def write(self, recs: bytes):
+        """Uno o más registros ya codificados (encode_record / RoundRecorder.finish)."""
+        self.f.write(recs)
+
+    def write_round(self, seed: int, first_round: bool, starter: int, points: Tuple[int, int],
+                    actions: bytes):
+        self.write(encode_record(seed, first_round, starter, points, actions))
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class RecordReader:
+    """Itera los registros de un archivo mapeado en memoria. ValueError si el archivo está
+    vacío, no llega a la cabecera o no es de este formato (o de otra versión).
+    truncated: bytes de un registro incompleto al final (tras recorrerlo entero)."""
+    def __init__(self, path: str):
+        self.f = open(path, "rb")
+        size = os.fstat(self.f.fileno()).st_size
+        if size < len(MAGIC):
+            self.f.close()
+            raise ValueError(f"{path}: archivo vacío o truncado ({size} bytes), "
+                             f"sin la cabecera de {len(MAGIC)} bytes")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        head = self.mm[:len(MAGIC)]
+        if head != MAGIC:
+            self.close()
+            if head[:-1] == MAGIC[:-1]:
+                raise ValueError(f"{path}: versión {head[-1]} del formato, se espera {MAGIC[-1]}")
+            raise ValueError(f"{path}: no es un registro de rondas")
+        self.truncated = 0
+
+    def __iter__(self) -> Iterator[Record]:
+        mm = self.mm
+        pos = len(MAGIC)
+        end = len(mm)
+        size = HEADER.size
+        while pos + size <= end:
+            seed, flags, pa, pb, n = HEADER.unpack_from(mm, pos)
+            if pos + size + n > end:
+                break   # registro truncado (escritura interrumpida)
+            yield Record(seed, bool(flags & FIRST_ROUND), flags & 3, (pa, pb),
+                         mm[pos + size:pos + size + n])
+            pos += size + n
+        self.truncated = end - pos
+
+    def filter(self, pred: Callable[[Record], bool]) -> Iterator[Record]:
+        return (r for r in self if pred(r))
+
+    def close(self):
+        self.mm.close()
+        self.f.close()
+
+    def __enter__(self) -> "RecordReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def replay(rec: Record, engine: str = "bits") -> Game:
+    """Reconstruye la ronda en un Game nuevo. ValueError si una acción no es legal."""
+    g = Game(engine=engine)
+    g.first_round = rec.first_round
+    g.next_starter = rec.starter
+    g.deal_round(rec.seed)
+    for code in rec.actions:
+        moves = g.legal_moves()
+        act = decode_action(code)
+        if act is None:
+            if moves:
+                raise ValueError("pase con jugadas disponibles")
+            g.pass_turn()
+            continue
+        tid, side = act
+        mv = next((m for m in moves if m.side == side and TILE_ID[m.dom] == tid), None)
+        if mv is None:
+            raise ValueError(f"jugada ilegal: ficha {tid} por {side}")
+        g.play_move(mv)
+    return g
+
+def verify(rec: Record, engine: str = "bits") -> Optional[str]:
+    """None si el registro se reproduce en Game (acciones legales, ronda terminada y mismos
+    puntos); si no, la descripción del problema."""
+    try:
+        g = replay(rec, engine)
+    except ValueError as e:
+        return str(e)
+    if not g.round_over():
+        return "la ronda no terminó"
+    points = g.round_score()
+    if points != rec.points:
+        return f"puntos {points} != registrados {rec.points}"
+    return None
+
+def verify_file(path: str, engine: str = "bits", limit: Optional[int] = None) -> Tuple[int, List[Tuple[int, str]]]:
+    """(registros revisados, [(índice, problema)])."""
+    bad = []
+    n = 0
+    with RecordReader(path) as rd:
+        for i, rec in enumerate(rd):
+            if limit is not None and i >= limit:
+                break
+            err = verify(rec, engine)
+            if err is not None:
+                bad.append((i, err))
+            n += 1
+    return n, bad
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Registros binarios de rondas")
+    ap.add_argument("cmd", choices=("info", "verify"))
+    ap.add_argument("path")
+    ap.add_argument("--limit", type=int, default=None, help="verify: solo los primeros N")
+    args = ap.parse_args(argv)
+    if args.cmd == "info":
+        rounds = blocked = actions = 0
+        points = [0, 0]
+        with RecordReader(args.path) as rd:
+            for rec in rd:
+                rounds += 1
+                blocked += rec.blocked
+                actions += len(rec.actions)
+                points[0] += rec.points[0]; points[1] += rec.points[1]
+            truncated = rd.truncated
+        print(f"Rondas: {rounds}  bloqueadas: {blocked}  acciones: {actions}  puntos A={points[0]} B={points[1]}")
+        if truncated:
+            print(f"Aviso: {truncated} bytes de un registro incompleto al final (ignorados)")
+        return
+    n, bad = verify_file(args.path, limit=args.limit)
+    for i, err in bad[:20]:
+        print(f"registro {i}: {err}")
+    print(f"Verificados: {n}  con problemas: {len(bad)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 
 from typing import List
-from .models import Dom, Move
+from .models import Chain, Dom, Move
 
 def can_play_on(end: int, d: Dom) -> bool:
     a, b = d
@@ -16,12 +16,12 @@ def orient_for_right(R: int, d: Dom) -> Dom:
     a, b = d
     return (a, b) if a == R else (b, a)
 
-def legal_moves(chain: List[Dom], hand: List[Dom]) -> List[Move]:
+def legal_moves(chain: Chain, hand: List[Dom]) -> List[Move]:
     if not chain:
         return [Move(d, "OPEN") for d in hand]
 
-    L = chain[0][0]
-    R = chain[-1][1]
+    L = chain.left
+    R = chain.right
     moves: List[Move] = []
 
     for d in hand:
@@ -32,29 +32,35 @@ def legal_moves(chain: List[Dom], hand: List[Dom]) -> List[Move]:
 
     return moves
 
-def apply_move(chain: List[Dom], mv) -> List[Dom]:
-    """Inserta la ficha orientándola correctamente según el lado elegido."""
+def apply_move(chain: Chain, mv) -> Chain:
+    """Inserta la ficha orientándola correctamente según el lado elegido.
+    Modifica la cadena en sitio (O(1)) y la devuelve."""
     d = mv.dom
     if not chain:
         # mesa vacía: poner tal cual
-        return [d]
+        chain.append(d)
+        return chain
 
-    L = chain[0][0]     # extremo izquierdo actual
-    R = chain[-1][1]    # extremo derecho actual
+    L = chain.left      # extremo izquierdo actual
+    R = chain.right     # extremo derecho actual
     a, b = d
 
     if mv.side == 'L':
         # El valor que toque L debe quedar en la "derecha" de la ficha insertada (b == L)
         if b == L:
-            return [d] + chain
+            chain.appendleft(d)
+            return chain
         elif a == L:
-            return [(b, a)] + chain
+            chain.appendleft((b, a))
+            return chain
     elif mv.side == 'R':
         # El valor que toque R debe quedar en la "izquierda" de la ficha insertada (a == R)
         if a == R:
-            return chain + [d]
+            chain.append(d)
+            return chain
         elif b == R:
-            return chain + [(b, a)]
+            chain.append((b, a))
+            return chain
 
     # Si cae aquí es un movimiento inválido
     raise ValueError(f"Movimiento inválido: dom={d}, side={mv.side}, ends={(L,R)}")
@@ -0,0 +1,288 @@
+"""Servidor asyncio de mesas: muchas partidas (Game) en un proceso, con un protocolo de
+JSON por líneas sobre TCP local.
+
+Cada línea es un pedido con "op" y un "id" opcional que se devuelve en la respuesta (las
+respuestas de una conexión pueden llegar en otro orden):
+
+    {"op": "new", "humans": [0], "seed": 7, "bot": "heuristic"}   -> crea mesa y reparte
+    {"op": "state", "table": 1}
+    {"op": "move", "table": 1, "index": 2}     índice en "legal"; -1 = pasar (como cli_human)
+    {"op": "close", "table": 1}
+
+Una conexión solo opera sobre las mesas que creó; al desconectarse, esas mesas se borran.
+
+Las respuestas traen el estado visto desde el asiento humano ("hand", "legal" si le toca)
+y los eventos desde la respuesta anterior: ["move", pid, [a, b, lado]], ["pass", pid],
+["round", puntosA, puntosB], ["deal", quien_abre]. Las rondas se puntúan y se reparten
+solas hasta que un equipo llega a TARGET.
+
+Los turnos de bots corren en un pool (procesos por defecto) sobre Game.snapshot(): un
+solo viaje por jugada humana avanza todos los bots hasta el próximo turno humano. Cada
+conexión tiene a lo sumo max_inflight pedidos en curso; con eso lleno el servidor deja
+de leer su socket (contrapresión hasta el cliente), y cada escritura espera drain()."""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from .ai import make_bot
+from .game import Game
+from .models import Move
+
+TARGET = 100
+MAX_INFLIGHT = 8
+MAX_LINE = 64 * 1024
+
+class ProtocolError(Exception):
+    pass
+
+def make_executor(kind: str = "process", workers: Optional[int] = None) -> Optional[Executor]:
+    """'process', 'thread' o 'inline' (None: los bots corren en el propio bucle)."""
+    if kind == "inline":
+        return None
+    workers = workers or os.cpu_count() or 1
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="domino-bot")
+    raise ValueError(f"executor desconocido: {kind}")
+
+def advance_bots(g: Game, humans: Set[int]) -> List[Optional[Move]]:
+    """Juega los turnos de bots hasta un turno humano o el fin de la ronda (sobre g)."""
+    out = []
+    while not g.round_over() and g.current not in humans:
+        mv = g.decide_ai()
+        g.apply_ai(mv)
+        out.append(mv)
+    return out
+
+def _advance_snapshot(args) -> List[Optional[Move]]:
+    g, humans = args
+    return advance_bots(g, humans)
+
+def _move_json(mv: Move) -> list:
+    return [mv.dom[0], mv.dom[1], mv.side]
+
+class Table:
+    def __init__(self, tid: int, humans: Set[int], seed: Optional[int], bot: str):
+        if not humans <= {0, 1, 2, 3}:
+            raise ProtocolError("asientos humanos fuera de 0..3")
+        b = make_bot(bot)
+        self.tid = tid
+        self.humans = humans
+        self.g = Game(random.Random(seed), engine="bits",
+                      bots=[None if p in humans else b for p in range(4)])
+        self.lock = asyncio.Lock()
+        self.events: List[list] = []
+        self.over = False
+
+    def record(self, pid: int, mv: Optional[Move]):
+        self.events.append(["pass", pid] if mv is None else ["move", pid, _move_json(mv)])
+
+    def deal(self):
+        self.g.deal_round()
+        for pid, mv, _L, _R in self.g.log:   # salida forzada de la primera ronda
+            self.record(pid, mv)
+        self.events.append(["deal", self.g.first_player])
+
+    def seat(self) -> int:
+        if self.g.current in self.humans:
+            return self.g.current
+        return min(self.humans) if self.humans else -1
+
+    def state(self) -> Dict:
+        g = self.g
+        seat = self.seat()
+        my_turn = not self.over and g.current in self.humans
+        out = {"table": self.tid, "seat": seat, "current": g.current, "scores": list(g.scores),
+               "chain": [list(d) for d in g.chain], "ends": list(g.ends()),
+               "sizes": g.hands_sizes(), "hand": [list(d) for d in g.hands[seat]] if seat >= 0 else [],
+               "legal": [_move_json(mv) for mv in g.legal_moves()] if my_turn else None,
+               "over": self.over, "events": self.events}
+        if self.over:
+            out["winner"] = 0 if g.scores[0] >= TARGET else 1
+        self.events = []
+        return out
+
+class TableServer:
+    def __init__(self, executor: Optional[Executor] = None, max_inflight: int = MAX_INFLIGHT):
+        self.executor = executor
+        self.max_inflight = max_inflight
+        self.tables: Dict[int, Table] = {}
+        self._ids = itertools.count(1)
+        self.actions = 0   # jugadas y pases aplicados (humanos y bots)
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._conns: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    # ---------- lógica de mesa ----------
+    async def _bots(self, t: Table) -> List[Optional[Move]]:
+        args = (t.g.snapshot(), t.humans)
+        if self.executor is None:
+            return _advance_snapshot(args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _advance_snapshot, args)
+
+    async def _advance(self, t: Table):
+        """Bots, cierre de rondas y nuevos repartos hasta un turno humano o el fin."""
+        g = t.g
+        while True:
+            if g.round_over():
+                a, b = g.round_score()
+                g.scores[0] += a; g.scores[1] += b
+                t.events.append(["round", a, b])
+                if g.scores[0] >= TARGET or g.scores[1] >= TARGET:
+                    t.over = True
+                    return
+                t.deal()
+                continue
+            if g.current in t.humans:
+                return
+            for mv in await self._bots(t):
+                t.record(g.current, mv)
+                g.apply_ai(mv)
+                self.actions += 1
+
+    def _table(self, req: Dict, owned: Optional[Set[int]]) -> Table:
+        tid = req.get("table")
+        t = self.tables.get(tid)
+        if t is None:
+            raise ProtocolError("mesa inexistente")
+        if owned is not None and tid not in owned:
+            raise ProtocolError("la mesa es de otra conexión")
+        return t
+
+    async def dispatch(self, req: Dict, owned: Optional[Set[int]] = None) -> Dict:
+        """Atiende un pedido. owned: mesas de la conexión (se borran cuando se desconecta);
+        si se da, state/move/close solo valen sobre ellas. None: cualquier mesa."""
+        op = req.get("op")
+        if op == "new":
+            tid = next(self._ids)
+            t = Table(tid, set(req.get("humans", [0])), req.get("seed"), req.get("bot", "heuristic"))
+            self.tables[tid] = t
+            if owned is not None:
+                owned.add(tid)
+            async with t.lock:
+                t.deal()
+                await self._advance(t)
+                return t.state()
+        if op == "state":
+            t = self._table(req, owned)
+            async with t.lock:
+                return t.state()
+        if op == "move":
+            t = self._table(req, owned)
+            async with t.lock:
+                g = t.g
+                if t.over or g.current not in t.humans:
+                    raise ProtocolError("no es turno de un humano")
+                moves = g.legal_moves()
+                idx = req.get("index")
+                if not isinstance(idx, int) or not -1 <= idx < len(moves):
+                    raise ProtocolError("índice inválido")
+                mv = None if idx == -1 else moves[idx]
+                t.record(g.current, mv)
+                g.apply_ai(mv)
+                self.actions += 1
+                await self._advance(t)
+                return t.state()
+        if op == "close":
+            tid = req.get("table")
+            if tid in self.tables:    # cerrar una mesa que ya no existe no es error
+                self._table(req, owned)
+                del self.tables[tid]
+                if owned is not None:
+                    owned.discard(tid)
+            return {"closed": tid}
+        raise ProtocolError(f"op desconocida: {op}")
+
+    # ---------- red ----------
+    async def _serve(self, line: bytes, writer: asyncio.StreamWriter, wlock: asyncio.Lock,
+                     sem: asyncio.Semaphore, owned: Set[int]):
+        rid = None
+        try:
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict):
+                    raise ProtocolError("se espera un objeto JSON")
+                rid = req.get("id")
+                resp = {"id": rid, "ok": True, **(await self.dispatch(req, owned))}
+            except (ProtocolError, ValueError, TypeError) as e:
+                resp = {"id": rid, "ok": False, "error": str(e)}
+            except Exception as e:    # falla interna (p. ej. un worker del pool): igual se responde
+                resp = {"id": rid, "ok": False, "error": f"error interno: {type(e).__name__}"}
+            try:
+                async with wlock:
+                    writer.write(json.dumps(resp, separators=(",", ":")).encode() + b"\n")
+                    await writer.drain()
+            except ConnectionError:
+                pass
+        finally:
+            sem.release()    # el lugar se libera pase lo que pase (también si se cancela)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = asyncio.current_task()
+        self._conns[conn] = writer
+        sem = asyncio.Semaphore(self.max_inflight)
+        wlock = asyncio.Lock()
+        tasks: Set[asyncio.Task] = set()
+        owned: Set[int] = set()    # mesas creadas por esta conexión
+        try:
+            while True:
+                await sem.acquire()    # contrapresión: no se lee más hasta liberar un lugar
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):   # línea demasiado larga / conexión caída
+                    break
+                if not line:
+                    break
+                task = asyncio.create_task(self._serve(line, writer, wlock, sem, owned))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+            self._conns.pop(conn, None)
+            for tid in owned:     # mesas que el cliente no cerró: no quedan vivas en el proceso
+                self.tables.pop(tid, None)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        return self.server
+
+    async def close(self):
+        """Deja de aceptar conexiones, corta las abiertas y apaga el pool."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for writer in self._conns.values():
+            writer.close()    # el readline de cada conexión ve EOF y handle termina solo
+        await asyncio.gather(*self._conns, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+async def serve(host: str, port: int, executor_kind: str, workers: Optional[int]):
+    server = TableServer(make_executor(executor_kind, workers))
+    srv = await server.start(host, port)
+    print(f"Servidor de mesas en {host}:{srv.sockets[0].getsockname()[1]}")
+    async with srv:
+        await srv.serve_forever()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Servidor de mesas (JSON por líneas sobre TCP)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--executor", choices=("process", "thread", "inline"), default="process")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.executor, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Duelo secuencial (SPRT) entre dos configuraciones de bot.
+
+Cada semilla se juega dos veces con cli_sim.play_match (mismos repartos ronda a ronda),
+con la configuración A en el equipo 0 y luego en el 1. El puntaje del par es la fracción
+de partidas ganadas por A (unit="match") o de rondas decididas ganadas por A
+(unit="round"). Sobre esos puntajes se aplica un SPRT generalizado (aproximación normal
+con la varianza observada de los pares, que ya incluye la correlación del emparejamiento):
+
+    H0: puntaje esperado de A = p0      H1: puntaje esperado de A = p1
+
+y se detiene en cuanto la razón de verosimilitud cruza log(beta/(1-alpha)) (acepta H0) o
+log((1-beta)/alpha) (acepta H1). Los pares se evalúan en un pool de procesos pero se
+consumen en orden de semilla, así que el punto de parada no depende de los workers.
+
+Configuraciones: "heuristic", "heuristic:1.4,1.2,0.5,0.3" (pesos), "pimc:samples=16",
+"ismcts:iterations=300,c=0.7" (argumentos de make_bot).
+
+    python -m domino.sprt heuristic:1.6,1.2,0.5,0.3 heuristic --p0 0.5 --p1 0.55"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .ai import HeuristicPlayer, make_bot
+from .cli_sim import match_seed, play_match
+from .tune import mean_ci
+
+MIN_PAIRS = 16   # sin decisiones antes: la varianza observada todavía no es confiable
+# piso de la varianza: con muestras constantes (p. ej. el mismo bot contra sí mismo, donde
+# cada par da exactamente 0.5) la razón de verosimilitud sigue creciendo y el test termina
+VAR_FLOOR = 1e-3
+
+def _value(v: str):
+    for conv in (int, float):
+        try:
+            return conv(v)
+        except ValueError:
+            pass
+    return v
+
+def make_player(spec: str, seed: Optional[int] = None):
+    """Bot para Game.bots a partir de una configuración (ver el docstring del módulo). Los
+    bots con búsqueda usan random.Random(seed) para que la partida se pueda repetir."""
+    name, _, args = spec.partition(":")
+    if name == "heuristic":
+        weights = tuple(float(w) for w in args.split(",")) if args else None
+        return HeuristicPlayer(weights) if weights else HeuristicPlayer()
+    kwargs = {}
+    for kv in filter(None, args.split(",")):
+        k, _, v = kv.partition("=")
+        kwargs[k] = _value(v)
+    if name in ("pimc", "ismcts"):
+        kwargs.setdefault("rng", random.Random(seed))
+    return make_bot(name, **kwargs)
+
+def play_pair(args) -> Tuple[float, float]:
+    """(fracción de partidas ganadas por A, fracción de rondas decididas ganadas por A) en
+    el par de partidas con la misma semilla y los equipos intercambiados."""
+    seed, spec_a, spec_b, engine = args
+    a, b = make_player(spec_a, seed), make_player(spec_b, seed + 1)
+    as_0 = play_match(seed, engine, bots=[a, b, a, b])
+    a, b = make_player(spec_a, seed + 2), make_player(spec_b, seed + 3)
+    as_1 = play_match(seed, engine, bots=[b, a, b, a])
+    wins = (as_0["winner"] == 0) + (as_1["winner"] == 1)
+    won = as_0["round_wins"][0] + as_1["round_wins"][1]
+    decided = sum(as_0["round_wins"]) + sum(as_1["round_wins"])
+    return wins / 2, won / decided if decided else 0.5
+
+class SPRT:
+    """Razón de verosimilitud acumulada de H1 (media p1) contra H0 (media p0) para
+    muestras en [0, 1], con la varianza estimada de las propias muestras."""
+    def __init__(self, p0: float = 0.5, p1: float = 0.55, alpha: float = 0.05, beta: float = 0.05):
+        if not 0.0 <= p0 < p1 <= 1.0:
+            raise ValueError("se necesita 0 <= p0 < p1 <= 1")
+        self.p0, self.p1 = p0, p1
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def add(self, x: float):
+        self.n += 1
+        self.total += x
+        self.total_sq += x * x
+
+    def llr(self) -> float:
+        n = self.n
+        if n < 2:
+            return 0.0
+        mean = self.total / n
+        var = max(self.total_sq / n - mean * mean, VAR_FLOOR)
+        return (self.p1 - self.p0) * (self.total - n * (self.p0 + self.p1) / 2) / var
+
+    def decision(self, min_n: int = MIN_PAIRS) -> Optional[str]:
+        """'H1', 'H0' o None (seguir jugando)."""
+        if self.n < min_n:
+            return None
+        llr = self.llr()
+        if llr >= self.upper:
+            return "H1"
+        if llr <= self.lower:
+            return "H0"
+        return None
+
+def _stream(jobs: List[tuple], workers: int, batch: int) -> Iterator[Tuple[float, float]]:
+    """Resultados de play_pair en el orden de jobs, calculados por tandas."""
+    if workers <= 1:
+        yield from map(play_pair, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        for i in range(0, len(jobs), batch):
+            yield from ex.map(play_pair, jobs[i:i + batch])
+
+def run_sprt(spec_a: str, spec_b: str, p0: float = 0.5, p1: float = 0.55, alpha: float = 0.05,
+             beta: float = 0.05, unit: str = "match", max_pairs: int = 20000, seed: int = 0,
+             engine: str = "bits", workers: Optional[int] = None, log=print) -> Dict:
+    """Juega pares hasta que el SPRT decide o se llega a max_pairs."""
+    if unit not in ("match", "round"):
+        raise ValueError(f"unidad desconocida: {unit}")
+    make_player(spec_a), make_player(spec_b)   # configuraciones inválidas: error antes de empezar
+    workers = workers or os.cpu_count() or 1
+    test = SPRT(p0, p1, alpha, beta)
+    jobs = [(match_seed(seed, i), spec_a, spec_b, engine) for i in range(max_pairs)]
+    scores: List[float] = []
+    decision = None
+    t0 = time.perf_counter()
+    stream = _stream(jobs, workers, batch=max(4 * workers, 32))
+    try:
+        for match_score, round_score in stream:
+            x = match_score if unit == "match" else round_score
+            scores.append(x)
+            test.add(x)
+            decision = test.decision()
+            if log is not None and test.n % 100 == 0:
+                log(f"  {test.n} pares  LLR {test.llr():+.2f}  [{test.lower:.2f}, {test.upper:.2f}]")
+            if decision is not None:
+                break
+    finally:
+        stream.close()
+    elapsed = time.perf_counter() - t0
+    return {"a": spec_a, "b": spec_b, "unit": unit, "p0": p0, "p1": p1, "alpha": alpha,
+            "beta": beta, "decision": decision, "llr": test.llr(),
+            "bounds": [test.lower, test.upper], "pairs": test.n, "matches": 2 * test.n,
+            "score": mean_ci(scores) if len(scores) > 1 else None, "seed": seed,
+            "seconds": elapsed}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Duelo SPRT entre dos configuraciones de bot")
+    ap.add_argument("a", help='configuración A, p. ej. "heuristic:1.6,1.2,0.5,0.3"')
+    ap.add_argument("b", help='configuración B, p. ej. "heuristic"')
+    ap.add_argument("--p0", type=float, default=0.5, help="puntaje esperado de A bajo H0")
+    ap.add_argument("--p1", type=float, default=0.55, help="puntaje esperado de A bajo H1")
+    ap.add_argument("--alpha", type=float, default=0.05)
+    ap.add_argument("--beta", type=float, default=0.05)
+    ap.add_argument("--unit", choices=("match", "round"), default="match")
+    ap.add_argument("--max-pairs", type=int, default=20000)
+    ap.add_argument("--workers", type=int, default=None, help="procesos (por defecto: núcleos)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--engine", choices=("list", "bits"), default="bits")
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args(argv)
+    r = run_sprt(args.a, args.b, args.p0, args.p1, args.alpha, args.beta, args.unit,
+                 args.max_pairs, args.seed, args.engine, args.workers)
+    verdict = {"H1": f"A es mejor (puntaje >= {r['p1']})", "H0": f"A no es mejor (puntaje <= {r['p0']})",
+               None: "sin decisión"}[r["decision"]]
+    print(f"{r['a']} vs {r['b']}: {verdict}")
+    print(f"Pares: {r['pairs']} ({r['matches']} partidas, {r['seconds']:.1f}s)  LLR {r['llr']:+.2f}  "
+          f"límites [{r['bounds'][0]:.2f}, {r['bounds'][1]:.2f}]")
+    if r["score"] is not None:
+        m, lo, hi = r["score"]
+        print(f"Puntaje de A por {r['unit']}: {m:.3f} [{lo:.3f}, {hi:.3f}]")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(r, f, indent=2)
+
+if __name__ == "__main__":
+    main()
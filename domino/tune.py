@@ -0,0 +1,154 @@
+"""Ajuste de los pesos de ai.score_move (ai.WEIGHTS) por autojuego en paralelo.
+
+Cada candidato juega contra los pesos base con números aleatorios comunes: la misma
+semilla de partida (mismos repartos ronda a ronda) se juega dos veces, con el candidato
+en el equipo A y luego en el B. La medida es el margen de puntos del candidato promediado
+sobre el par; todos los candidatos de una iteración usan las mismas semillas.
+
+La búsqueda es por entropía cruzada (CEM) sin derivadas. El peso de control queda fijo:
+multiplicar todos los pesos por una constante positiva no cambia la jugada elegida.
+
+    python -m domino.tune --iterations 8 --population 12 --matches 32 --confirm 400"""
+import argparse
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .ai import WEIGHTS, HeuristicPlayer
+from .cli_sim import match_seed, play_match
+
+Weights = Tuple[float, ...]
+NAMES = ("control", "anti_gift", "double_bonus", "diversity")
+FIXED = 0   # índice del peso que no se mueve (escala)
+
+def paired_match(args) -> Tuple[float, float]:
+    """(margen medio de puntos, fracción de partidas ganadas) del candidato en el par de
+    partidas con la misma semilla y los equipos intercambiados."""
+    seed, cand, base, engine = args
+    c, b = HeuristicPlayer(cand), HeuristicPlayer(base)
+    as_a = play_match(seed, engine, bots=[c, b, c, b])
+    as_b = play_match(seed, engine, bots=[b, c, b, c])
+    margin = (as_a["points"][0] - as_a["points"][1]) + (as_b["points"][1] - as_b["points"][0])
+    wins = (as_a["winner"] == 0) + (as_b["winner"] == 1)
+    return margin / 2, wins / 2
+
+def _map(jobs: list, workers: int, chunksize: int = 8) -> list:
+    if workers <= 1:
+        return [paired_match(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(paired_match, jobs, chunksize=chunksize))
+
+def mean_ci(xs: Sequence[float], z: float = 1.96) -> Tuple[float, float, float]:
+    """(media, límite inferior, límite superior) del intervalo normal al 95%."""
+    n = len(xs)
+    m = sum(xs) / n
+    sd = math.sqrt(sum((x - m) ** 2 for x in xs) / (n - 1)) if n > 1 else 0.0
+    h = z * sd / math.sqrt(n)
+    return m, m - h, m + h
+
+def evaluate(cands: List[Weights], base: Weights, seeds: List[int], engine: str = "bits",
+             workers: int = 1) -> List[Dict]:
+    """Margen y victorias de cada candidato contra base sobre las mismas semillas."""
+    jobs = [(s, c, base, engine) for c in cands for s in seeds]
+    res = _map(jobs, workers)
+    out = []
+    for i, c in enumerate(cands):
+        chunk = res[i * len(seeds):(i + 1) * len(seeds)]
+        out.append({"weights": list(c),
+                    "margin": mean_ci([m for m, _ in chunk]),
+                    "win_rate": mean_ci([w for _, w in chunk])})
+    return out
+
+def cem(iterations: int = 8, population: int = 12, elite: int = 4, matches: int = 32,
+        base: Weights = WEIGHTS, sigma: float = 0.4, min_sigma: float = 0.03,
+        seed: int = 0, engine: str = "bits", workers: int = 1,
+        log=print) -> Dict:
+    """Entropía cruzada: muestrea `population` candidatos de una normal por peso, evalúa
+    contra base con `matches` semillas nuevas por iteración (comunes a todos) y reajusta
+    media y desviación con los `elite` mejores. La media actual siempre participa."""
+    rng = random.Random(seed)
+    mean = list(base)
+    sd = [0.0 if i == FIXED else sigma for i in range(len(base))]
+    history = []
+    best: Optional[Dict] = None
+    for it in range(iterations):
+        cands: List[Weights] = [tuple(mean)]
+        while len(cands) < population:
+            cands.append(tuple(max(0.0, rng.gauss(m, s)) for m, s in zip(mean, sd)))
+        seeds = [match_seed(seed, it * 1_000_003 + i) for i in range(matches)]
+        scored = sorted(evaluate(cands, base, seeds, engine, workers),
+                        key=lambda r: r["margin"][0], reverse=True)
+        top = scored[:elite]
+        for i in range(len(mean)):
+            if i == FIXED:
+                continue
+            vals = [r["weights"][i] for r in top]
+            mean[i] = sum(vals) / len(vals)
+            sd[i] = max(min_sigma, math.sqrt(sum((v - mean[i]) ** 2 for v in vals) / len(vals)))
+        if best is None or scored[0]["margin"][0] > best["margin"][0]:
+            best = scored[0]
+        history.append({"iteration": it, "mean": list(mean), "sd": list(sd), "top": top[0]})
+        log(f"iter {it}: media {_fmt(mean)}  sd {_fmt(sd)}  "
+            f"mejor {_fmt(top[0]['weights'])} margen {top[0]['margin'][0]:+.2f}")
+    return {"mean": mean, "sd": sd, "best_sample": best, "history": history}
+
+def _fmt(w: Sequence[float]) -> str:
+    return "(" + ", ".join(f"{x:.3f}" for x in w) + ")"
+
+def tune(iterations: int = 8, population: int = 12, elite: int = 4, matches: int = 32,
+         confirm: int = 400, seed: int = 0, engine: str = "bits", workers: Optional[int] = None,
+         log=print) -> Dict:
+    """CEM y luego confirmación de la media final con `confirm` semillas no usadas en la
+    búsqueda (el mejor de la búsqueda está sesgado hacia arriba). "spread" de cada peso es
+    media ± 2 sd de la distribución final de CEM (cuánto se dispersó la búsqueda, acotada
+    abajo por min_sigma; no es un intervalo de confianza). El margen y la tasa de victorias
+    llevan intervalos normales al 95% sobre los pares de la confirmación."""
+    workers = workers or os.cpu_count() or 1
+    search = cem(iterations, population, elite, matches, WEIGHTS, seed=seed, engine=engine,
+                 workers=workers, log=log)
+    final = tuple(search["mean"])
+    seeds = [match_seed(seed + 1, i) for i in range(confirm)]
+    check = evaluate([final], WEIGHTS, seeds, engine, workers)[0]
+    return {
+        "base": list(WEIGHTS),
+        "weights": {n: {"value": w, "spread": [max(0.0, w - 2 * s), w + 2 * s]}
+                    for n, w, s in zip(NAMES, search["mean"], search["sd"])},
+        "vector": list(final),
+        "confirm": {"matches": confirm, "margin": check["margin"], "win_rate": check["win_rate"]},
+        "search": search,
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Ajuste de pesos de ai.score_move por autojuego")
+    ap.add_argument("--iterations", type=int, default=8)
+    ap.add_argument("--population", type=int, default=12)
+    ap.add_argument("--elite", type=int, default=4)
+    ap.add_argument("--matches", type=int, default=32, help="semillas (pares de partidas) por candidato")
+    ap.add_argument("--confirm", type=int, default=400, help="pares de partidas para confirmar")
+    ap.add_argument("--workers", type=int, default=None, help="procesos (por defecto: núcleos)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--engine", choices=("list", "bits"), default="bits")
+    ap.add_argument("--json", default=None, help="escribe el resultado en este archivo")
+    args = ap.parse_args(argv)
+
+    res = tune(args.iterations, args.population, args.elite, args.matches, args.confirm,
+               args.seed, args.engine, args.workers)
+    print(f"Pesos base: {_fmt(res['base'])}")
+    print("Pesos finales (dispersión final de CEM, media ± 2 sd):")
+    for i, (n, w) in enumerate(res["weights"].items()):
+        spread = "fijo" if i == FIXED else f"[{w['spread'][0]:.3f}, {w['spread'][1]:.3f}]"
+        print(f"  {n:<13} {w['value']:.3f}  {spread}")
+    c = res["confirm"]
+    m, lo, hi = c["margin"]
+    wr, wlo, whi = c["win_rate"]
+    print(f"Contra la base ({c['matches']} pares): margen {m:+.2f} pts/partida [{lo:+.2f}, {hi:+.2f}]  "
+          f"victorias {wr*100:.1f}% [{wlo*100:.1f}, {whi*100:.1f}]")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+
+if __name__ == "__main__":
+    main()
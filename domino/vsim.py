@@ -0,0 +1,295 @@
+"""Simulador vectorizado: miles de rondas independientes avanzan juntas como arrays de NumPy.
+
+Manos como matrices booleanas (n,4,28) sobre all_double6(), extremos como arrays de enteros
+y pases como contadores. Cada jugador usa la misma heurística que ai.choose_move (con la
+creencia omnisciente que arma Game y los pesos `weights`, ai.WEIGHTS por defecto) y las
+rondas se puntúan como Game.round_score.
+"""
+import random
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from .ai import WEIGHTS, HeuristicPlayer
+from .bitboard import TILES, N_TILES
+from .game import Game
+
+TA = np.array([a for a, b in TILES], dtype=np.int64)   # número izquierdo (a <= b)
+TB = np.array([b for a, b in TILES], dtype=np.int64)   # número derecho
+TPIPS = TA + TB
+IS_DOUBLE = TA == TB
+DOUBLE_SIX = N_TILES - 1                               # (6,6) es la última ficha
+
+# PIP_HAS[t,p]: la ficha t contiene p ; PIP_COUNT[t,p]: veces que aparece p (mula = 2)
+PIP_HAS = np.zeros((N_TILES, 7), dtype=bool)
+PIP_COUNT = np.zeros((N_TILES, 7), dtype=np.int64)
+for _t, (_a, _b) in enumerate(TILES):
+    PIP_HAS[_t, _a] = PIP_HAS[_t, _b] = True
+    PIP_COUNT[_t, _a] += 1
+    PIP_COUNT[_t, _b] += 1
+
+# TID[e,k]: id de la ficha {e,k}
+TID = np.zeros((7, 7), dtype=np.int64)
+for _t, (_a, _b) in enumerate(TILES):
+    TID[_a, _b] = TID[_b, _a] = _t
+KS = np.arange(7)
+
+CHUNK = 16384
+
+
+def deal(n: int, rng: np.random.Generator) -> np.ndarray:
+    """Reparte n rondas: devuelve manos booleanas (n,4,28)."""
+    perm = np.argsort(rng.random((n, N_TILES)), axis=1)
+    owner = np.empty((n, N_TILES), dtype=np.int64)
+    rows = np.arange(n)[:, None]
+    owner[rows, perm] = np.arange(N_TILES)[None, :] // 7
+    return owner[:, None, :] == np.arange(4)[None, :, None]
+
+
+def hands_from_lists(hands_lists) -> np.ndarray:
+    """Convierte manos de Game (listas de fichas) a una fila booleana (4,28)."""
+    from .bitboard import TILE_ID
+    h = np.zeros((4, N_TILES), dtype=bool)
+    for pid, hand in enumerate(hands_lists):
+        for d in hand:
+            h[pid, TILE_ID[d]] = True
+    return h
+
+
+def pip_counts(H: np.ndarray) -> np.ndarray:
+    """Cuenta de cada número en las manos (...,28) -> (...,7); la mula cuenta doble."""
+    return (H.astype(np.float32) @ PIP_COUNT.astype(np.float32)).astype(np.int64)
+
+
+def _score(cnt, opp, newL, newR, removed, rem_ctrl, drop, double, weights):
+    """Misma fórmula (y mismo orden de operaciones) que ai.score_move con esos pesos."""
+    wc, wa, wd, wv = weights
+    control = np.take_along_axis(cnt, newL, 1) + np.take_along_axis(cnt, newR, 1) - removed * rem_ctrl
+    anti_gift = 1.0 - np.maximum(np.take_along_axis(opp, newL, 1), np.take_along_axis(opp, newR, 1))
+    diversity = (cnt > 0).sum(axis=1)[:, None] - removed * drop
+    return wc * control + wa * anti_gift + wd * np.where(double, 0.5, 0.0) + wv * diversity
+
+
+def _side_features(H, cnt, e, other):
+    """Candidatos por el extremo e (m,): las 7 fichas {e,k}; k es el extremo nuevo y
+    other el opuesto, que no cambia. Devuelve (tiles, ok, k, double, drop, rem_ctrl) (m,7)."""
+    m = H.shape[0]
+    ec = e[:, None]
+    oc = other[:, None]
+    tiles = TID[e]
+    ok = np.take_along_axis(H, tiles, 1)
+    k = np.broadcast_to(KS[None, :], (m, 7))
+    double = k == ec
+    cnt_e = np.take_along_axis(cnt, ec, 1)
+    drop = np.where(double, cnt_e == 2, (cnt_e == 1).astype(np.int64) + (cnt == 1))
+    # veces que la ficha {e,k} aporta a los números k y other
+    rem_ctrl = (1 + double) + (ec == oc).astype(np.int64) + (k == oc)
+    return tiles, ok, k, double, drop, rem_ctrl
+
+
+def choose_batch(H: np.ndarray, cnt: np.ndarray, L: np.ndarray, R: np.ndarray, opp: np.ndarray,
+                 weights: Sequence[float] = WEIGHTS):
+    """Elige una jugada por fila como ai.choose_move (con los pesos de score_move dados).
+    H:(m,28) mano actual, cnt:(m,7) sus conteos por número, L/R:(m,) extremos (-1 = mesa
+    vacía), opp:(m,7) probabilidad de que el rival (jugador+1) pueda jugar cada número.
+    Devuelve (tile, side, has_move) con side 0='L', 1='R', 2='OPEN'."""
+    m = H.shape[0]
+    tile = np.zeros(m, dtype=np.int64)
+    side = np.zeros(m, dtype=np.int64)
+    has_move = np.zeros(m, dtype=bool)
+    is_open = L < 0
+
+    op = np.nonzero(is_open)[0]
+    if op.size:
+        Ho, co, oo = H[op], cnt[op], opp[op]
+        mo = op.size
+        newL = np.broadcast_to(TA[None, :], (mo, N_TILES))
+        newR = np.broadcast_to(TB[None, :], (mo, N_TILES))
+        cA = np.take_along_axis(co, newL, 1)
+        cB = np.take_along_axis(co, newR, 1)
+        drop = np.where(IS_DOUBLE[None, :], cA == 2, (cA == 1).astype(np.int64) + (cB == 1))
+        rem_ctrl = np.where(IS_DOUBLE, 4, 2)[None, :]
+        sc = _score(co, oo, newL, newR, 1, rem_ctrl, drop, IS_DOUBLE[None, :], weights)
+        sc = np.where(Ho, sc, -np.inf)
+        best = sc.argmax(axis=1)
+        tile[op] = best
+        side[op] = 2
+        has_move[op] = Ho.any(axis=1)
+
+    cl = np.nonzero(~is_open)[0]
+    if cl.size:
+        Hc, cc, oc_, Lc, Rc = H[cl], cnt[cl], opp[cl], L[cl], R[cl]
+        mc = cl.size
+        # Lado L: la ficha queda orientada con b == L; ai.choose_move solo la quita de
+        # hand_after si esa orientación coincide con la normalizada (k <= L). Lado R: (k >= R).
+        tL, okL, k, dblL, dropL, remL = _side_features(Hc, cc, Lc, Rc)
+        sL = _score(cc, oc_, k, np.broadcast_to(Rc[:, None], (mc, 7)),
+                    (k <= Lc[:, None]).astype(np.int64), remL, dropL, dblL, weights)
+        tR, okR, k, dblR, dropR, remR = _side_features(Hc, cc, Rc, Lc)
+        sR = _score(cc, oc_, np.broadcast_to(Lc[:, None], (mc, 7)), k,
+                    (k >= Rc[:, None]).astype(np.int64), remR, dropR, dblR, weights)
+        sc = np.concatenate([np.where(okL, sL, -np.inf), np.where(okR, sR, -np.inf)], axis=1)
+        # desempate como rules.legal_moves: ficha ascendente, L antes que R
+        key = np.concatenate([tL * 2, tR * 2 + 1], axis=1)
+        top = sc.max(axis=1)
+        key = np.where(sc == top[:, None], key, 1 << 30)
+        best = key.min(axis=1)
+        tile[cl] = best // 2
+        side[cl] = best % 2
+        has_move[cl] = np.isfinite(top)
+    return tile, side, has_move
+
+
+def simulate_rounds(hands: np.ndarray, first_round, starter=None,
+                    weights: Sequence[float] = WEIGHTS) -> Dict[str, np.ndarray]:
+    """Juega hasta el final las rondas dadas (manos (n,4,28); no se modifican).
+    first_round: bool o array (n,) -> abre quien tenga el (6,6) jugándolo.
+    starter: array (n,) con el abridor de las rondas que no son la primera.
+    Devuelve scores (n,2), next_starter, first_player, blocked y turns (jugadas + pases)."""
+    n = hands.shape[0]
+    out = {k: np.empty(n, dtype=np.int64) for k in ("next_starter", "first_player", "turns")}
+    out["scores"] = np.empty((n, 2), dtype=np.int64)
+    out["blocked"] = np.empty(n, dtype=bool)
+    first_round = np.broadcast_to(np.asarray(first_round, dtype=bool), (n,))
+    starter = np.zeros(n, dtype=np.int64) if starter is None else np.broadcast_to(np.asarray(starter), (n,))
+    for lo in range(0, n, CHUNK):
+        hi = min(n, lo + CHUNK)
+        res = _simulate_chunk(hands[lo:hi], first_round[lo:hi], starter[lo:hi], weights)
+        for k, v in res.items():
+            out[k][lo:hi] = v
+    return out
+
+
+def _simulate_chunk(dealt: np.ndarray, first_round: np.ndarray, starter: np.ndarray,
+                    weights: Sequence[float]) -> Dict[str, np.ndarray]:
+    n = dealt.shape[0]
+    H = dealt.copy()
+    cnt = pip_counts(H)                                   # (n,4,7)
+    sizes = H.sum(axis=2)                                 # (n,4)
+    L = np.full(n, -1, dtype=np.int64)
+    R = np.full(n, -1, dtype=np.int64)
+    passes = np.zeros(n, dtype=np.int64)
+    turns = np.zeros(n, dtype=np.int64)
+    cur = starter.astype(np.int64).copy()
+    first_player = cur.copy()
+
+    # primera ronda: el dueño del (6,6) lo juega y pasa el turno a su derecha
+    if first_round.any():
+        fr = np.nonzero(first_round)[0]
+        opener = dealt[fr, :, DOUBLE_SIX].argmax(axis=1)
+        H[fr, opener, DOUBLE_SIX] = False
+        cnt[fr, opener, 6] -= 2
+        sizes[fr, opener] -= 1
+        L[fr] = R[fr] = 6
+        first_player[fr] = opener
+        cur[fr] = (opener + 1) % 4
+
+    act = np.arange(n)
+    while True:
+        act = act[(passes[act] < 4) & (sizes[act] > 0).all(axis=1)]
+        if act.size == 0:
+            break
+        c = cur[act]
+        # con la creencia omnisciente de Game, el rival "puede jugar" x (prob. 0/1) si aún
+        # tiene en la mano alguna ficha con x
+        opp = (cnt[act, (c + 1) % 4] > 0).astype(np.float64)
+        tile, side, has_move = choose_batch(H[act, c], cnt[act, c], L[act], R[act], opp, weights)
+
+        pl = act[has_move]
+        cp = c[has_move]
+        t = tile[has_move]
+        s = side[has_move]
+        H[pl, cp, t] = False
+        cnt[pl, cp] -= PIP_COUNT[t]
+        sizes[pl, cp] -= 1
+        op = s == 2
+        L[pl] = np.where(op, TA[t], np.where(s == 0, TPIPS[t] - L[pl], L[pl]))
+        R[pl] = np.where(op, TB[t], np.where(s == 1, TPIPS[t] - R[pl], R[pl]))
+        passes[pl] = 0
+        passes[act[~has_move]] += 1
+        turns[act] += 1
+        cur[act] = (c + 1) % 4
+
+    sums = (H.astype(np.float32) @ TPIPS.astype(np.float32)).astype(np.int64)   # (n,4)
+    empty = sizes == 0
+    has_winner = empty.any(axis=1)
+    winner_player = empty.argmax(axis=1)
+    sumA = sums[:, 0] + sums[:, 2]
+    sumB = sums[:, 1] + sums[:, 3]
+
+    scores = np.zeros((n, 2), dtype=np.int64)
+    wteam = winner_player % 2
+    scores[:, 0] = np.where(has_winner, np.where(wteam == 1, sumA, 0), np.where(sumA < sumB, sumB - sumA, 0))
+    scores[:, 1] = np.where(has_winner, np.where(wteam == 0, sumB, 0), np.where(sumB < sumA, sumA - sumB, 0))
+
+    # próximo abridor: quien dominó; en bloqueo, el de menor suma del equipo ganador
+    # (empate dentro del equipo -> el de menor índice); empate total -> rota
+    bestA = np.where(sums[:, 2] < sums[:, 0], 2, 0)
+    bestB = np.where(sums[:, 3] < sums[:, 1], 3, 1)
+    blocked_starter = np.where(sumA < sumB, bestA, np.where(sumB < sumA, bestB, (first_player + 1) % 4))
+    next_starter = np.where(has_winner, winner_player, blocked_starter)
+    return {"scores": scores, "next_starter": next_starter, "first_player": first_player,
+            "blocked": ~has_winner, "turns": turns}
+
+
+def simulate(n: int, seed: Optional[int] = None, first_round: bool = True, starter=None,
+             weights: Sequence[float] = WEIGHTS) -> Dict[str, np.ndarray]:
+    """Reparte y juega n rondas independientes."""
+    rng = np.random.default_rng(seed)
+    return simulate_rounds(deal(n, rng), first_round, starter, weights)
+
+
+def simulate_matches(n: int, seed: Optional[int] = None, target: int = 100,
+                     weights: Sequence[float] = WEIGHTS) -> Dict[str, np.ndarray]:
+    """Juega n partidas a `target` en paralelo (una ronda de cada partida activa por paso)."""
+    rng = np.random.default_rng(seed)
+    scores = np.zeros((n, 2), dtype=np.int64)
+    rounds = np.zeros(n, dtype=np.int64)
+    blocked = np.zeros(n, dtype=np.int64)
+    first_round = np.ones(n, dtype=bool)
+    starter = np.zeros(n, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+    while active.any():
+        act = np.nonzero(active)[0]
+        res = simulate_rounds(deal(act.size, rng), first_round[act], starter[act], weights)
+        scores[act] += res["scores"]
+        rounds[act] += 1
+        blocked[act] += res["blocked"]
+        starter[act] = res["next_starter"]
+        first_round[act] = False
+        active &= (scores < target).all(axis=1)
+    return {"scores": scores, "winner": (scores[:, 1] >= target).astype(np.int64),
+            "rounds": rounds, "blocked": blocked}
+
+
+def validate_against_game(n_matches: int = 50, seed: int = 0, weights: Sequence[float] = WEIGHTS) -> int:
+    """Juega partidas con Game (HeuristicPlayer(weights) en los cuatro asientos) y reproduce
+    cada ronda (mismas manos, mismo abridor) con el simulador vectorizado y los mismos pesos;
+    lanza AssertionError ante la primera diferencia.
+    Devuelve el número de rondas comparadas."""
+    deals, firsts, starters, expected = [], [], [], []
+    for m in range(n_matches):
+        g = Game(random.Random(seed * 1_000_003 + m), bots=[HeuristicPlayer(weights)] * 4)
+        while g.scores[0] < 100 and g.scores[1] < 100:
+            firsts.append(g.first_round)
+            starters.append(g.next_starter if g.next_starter is not None else 0)
+            g.deal_round()
+            # manos originales: las actuales + la mula abierta en la primera ronda
+            hands = [list(h) for h in g.hands]
+            if firsts[-1]:
+                hands[g.first_player].append(g.chain[0])
+            deals.append(hands_from_lists(hands))
+            turns = 0
+            while not g.round_over():
+                g.step_ai()
+                turns += 1
+            blocked = all(len(h) > 0 for h in g.hands)
+            a, b = g.round_score()
+            g.scores[0] += a; g.scores[1] += b
+            expected.append((a, b, g.next_starter, g.first_player, blocked, turns))
+    res = simulate_rounds(np.stack(deals), np.array(firsts), np.array(starters), weights=weights)
+    for i, exp in enumerate(expected):
+        got = (int(res["scores"][i, 0]), int(res["scores"][i, 1]), int(res["next_starter"][i]),
+               int(res["first_player"][i]), bool(res["blocked"][i]), int(res["turns"][i]))
+        assert got == exp, f"ronda {i}: vsim={got} game={exp}"
+    return len(expected)
@@ -0,0 +1,38 @@
+"""choose_moves (lote) contra choose_move posición por posición."""
+import random
+
+import pytest
+
+from domino.ai import WEIGHTS, choose_move, choose_moves
+from domino.game import Game
+
+def positions(seed: int, shuffle: bool = False) -> list:
+    """(jugador, mano, mesa, creencia, tamaños) de cada turno de unas rondas al azar, con la
+    creencia del jugador (probabilidades intermedias) o la omnisciente de Game en turnos
+    alternos. shuffle=True desordena la mano y da vuelta alguna ficha."""
+    rng = random.Random(seed)
+    g = Game(random.Random(seed), engine="bits")
+    out = []
+    for _ in range(4):
+        g.deal_round(rng.getrandbits(64))
+        while not g.round_over():
+            pid = g.current
+            hand = list(g.hands[pid])
+            if shuffle and hand:
+                rng.shuffle(hand)
+                i = rng.randrange(len(hand))
+                hand[i] = hand[i][::-1]
+            belief = g.belief_for(pid) if len(g.log) % 2 else g.belief.copy()
+            out.append((pid, hand, g.chain.copy(), belief, g.hands_sizes()))
+            g.step_ai()
+    return out
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("weights", [WEIGHTS, (0.3, 2.0, 1.5, -0.7)])
+@pytest.mark.parametrize("seed", range(5))
+def test_choose_moves_matches_choose_move(seed, weights, shuffle):
+    pos = positions(seed, shuffle)
+    states = [(pid, hand, chain.ends(), belief, sizes) for pid, hand, chain, belief, sizes in pos]
+    expected = [choose_move(pid, hand, chain, belief, sizes, weights=weights)
+                for pid, hand, chain, belief, sizes in pos]
+    assert choose_moves(states, weights) == expected
@@ -0,0 +1,45 @@
+"""engine="bits" contra engine="list": mismas jugadas, extremos y puntajes."""
+import random
+
+import pytest
+
+from domino.game import Game
+
+def play_rounds(seed: int, engine: str, **kwargs) -> list:
+    """Una partida a 100 con repartos por semilla: por ronda, (log, extremos, puntaje,
+    tamaños de mano, próximo abridor)."""
+    g = Game(random.Random(seed), engine=engine, **kwargs)
+    out = []
+    while g.scores[0] < 100 and g.scores[1] < 100:
+        g.deal_round(g.rng.getrandbits(64))
+        while not g.round_over():
+            g.step_ai()
+        a, b = g.round_score()
+        g.scores[0] += a; g.scores[1] += b
+        out.append((list(g.log), g.ends(), (a, b), g.hands_sizes(), g.next_starter))
+    return out
+
+@pytest.mark.parametrize("seed", range(60))
+def test_same_match(seed):
+    assert play_rounds(seed, "bits") == play_rounds(seed, "list")
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_match_with_endgame_solver(seed):
+    assert play_rounds(seed, "bits", endgame_tiles=8) == play_rounds(seed, "list", endgame_tiles=8)
+
+def test_legal_moves_each_turn():
+    for seed in range(20):
+        gl = Game(random.Random(seed), engine="list")
+        gb = Game(random.Random(seed), engine="bits")
+        gl.deal_round(seed)
+        gb.deal_round(seed)
+        while not gl.round_over():
+            assert not gb.round_over()
+            assert gb.legal_moves() == gl.legal_moves()
+            assert gb.state.count_moves() == len(gl.legal_moves())
+            assert gb.hands == gl.hands
+            assert gb.hands_sizes() == gl.hands_sizes()
+            mv = gl.step_ai()
+            assert gb.step_ai() == mv
+        assert gb.round_over()
+        assert gb.round_score() == gl.round_score()
@@ -0,0 +1,35 @@
+"""Libro de aperturas: el archivo de la tabla y su uso desde los bots de la heurística."""
+import random
+
+import pytest
+
+from domino.ai import HeuristicPlayer
+from domino.game import Game
+from domino.opening import N_HANDS, OpeningBook, generate
+
+def test_build_refuses_wrong_size_file(tmp_path):
+    path = tmp_path / "otro.bin"
+    path.write_bytes(b"0123456789")
+    with pytest.raises(ValueError):
+        generate(str(path), limit=1, log=None)
+    assert path.read_bytes() == b"0123456789"
+
+def book_always(tmp_path, index: int) -> OpeningBook:
+    """Libro falso: en toda mano, la salida es la ficha `index` de la mano ordenada."""
+    path = tmp_path / "libro.bin"
+    path.write_bytes(bytes([index]) * N_HANDS)
+    return OpeningBook(str(path))
+
+def test_heuristic_seats_use_book(tmp_path):
+    book = book_always(tmp_path, 6)
+    try:
+        for seed in range(10):
+            g = Game(random.Random(seed), engine="bits", bots=[HeuristicPlayer((1.0, 1.0, 1.0, 1.0))] * 4,
+                     opening_book=book)
+            g.first_round = False
+            g.next_starter = seed % 4
+            g.deal_round(seed)
+            hand = sorted(g.hands[g.current])
+            assert g.step_ai().dom == hand[6]
+    finally:
+        book.close()
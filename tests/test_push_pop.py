@@ -0,0 +1,77 @@
+"""Game.push/pop: deshacer devuelve exactamente el estado anterior y el hash de Zobrist
+incremental coincide con el calculado desde cero."""
+import random
+
+import pytest
+
+from domino.game import Game
+from domino.models import Move
+
+def fingerprint(g: Game) -> tuple:
+    b = g.belief
+    st = g.state
+    return ([list(h) for h in g.hands], list(g.chain), g.ends(), list(g.chain.pip_counts),
+            g.current, g.passes_in_row, list(g.log), g.zobrist, g.hands_sizes(),
+            (list(b.masks), b.played, b.unseen),
+            None if st is None else (list(st.hands), st.left, st.right, st.length,
+                                     st.current, st.passes_in_row))
+
+def check_rounds(n_rounds: int, seed: int, engine: str, depth: int = 4) -> int:
+    """Juega rondas al azar y en cada posición prueba cada jugada legal (o el pase) seguida
+    de hasta `depth` jugadas al azar, deshaciendo todo con pop(). Devuelve el número de
+    push/pop comprobados."""
+    rng = random.Random(seed)
+    checked = 0
+    for r in range(n_rounds):
+        g = Game(random.Random(seed * 1_000_003 + r), engine=engine)
+        g.first_round = rng.random() < 0.5
+        g.next_starter = rng.randrange(4)
+        g.deal_round()
+        while not g.round_over():
+            before = fingerprint(g)
+            for mv in g.legal_moves() or [None]:
+                g.push(mv)
+                k = 1
+                while k <= depth and not g.round_over():
+                    g.push(rng.choice(g.legal_moves() or [None]))
+                    k += 1
+                assert g.zobrist == g.compute_zobrist(), f"ronda {r}: zobrist desfasado"
+                if g.state is not None:
+                    assert g.zobrist == g.state.zobrist(), f"ronda {r}: zobrist != BitState"
+                for _ in range(k):
+                    g.pop()
+                checked += k
+                assert fingerprint(g) == before, f"ronda {r}, jugada {mv}"
+            g.push(rng.choice(g.legal_moves() or [None]))
+    return checked
+
+@pytest.mark.parametrize("engine", ["list", "bits"])
+def test_push_pop_restores_state(engine):
+    assert check_rounds(30, 0, engine) > 0
+
+def test_pop_returns_move_and_empties():
+    g = Game(random.Random(1), engine="bits")
+    g.first_round = False
+    g.next_starter = 0
+    g.deal_round(1)
+    mv = g.legal_moves()[0]
+    g.push(mv)
+    assert g.pop() == mv
+    with pytest.raises(IndexError):
+        g.pop()
+
+@pytest.mark.parametrize("engine", ["list", "bits"])
+def test_illegal_push_changes_nothing(engine):
+    g = Game(random.Random(2), engine=engine)
+    g.first_round = False
+    g.next_starter = 0
+    g.deal_round(2)
+    g.push(g.legal_moves()[0])
+    L, R = g.ends()
+    bad = next(d for d in g.hands[g.current] if L not in d and R not in d)
+    before = fingerprint(g)
+    with pytest.raises(ValueError):
+        g.push(Move(bad, "L"))
+    assert fingerprint(g) == before
+    g.pop()
+    assert g.log == [] and not g.chain
@@ -0,0 +1,60 @@
+"""Registros binarios de rondas: escritura y lectura, y archivos vacíos o cortados."""
+import pytest
+
+from domino.cli_sim import play_match
+from domino.records import HEADER, MAGIC, RecordReader, RecordWriter, verify, verify_file
+
+def write_matches(path, seeds) -> int:
+    """Anexa las rondas de unas partidas; devuelve los bytes de registros escritos."""
+    n = 0
+    with RecordWriter(str(path)) as w:
+        for seed in seeds:
+            recs = play_match(seed, "bits", record=True)["record"]
+            w.write(recs)
+            n += len(recs)
+    return n
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "rondas.bin"
+    with RecordWriter(str(path)) as w:
+        w.write_round(2**64 - 1, True, 0, (37, 0), b"")
+        w.write_round(5, False, 3, (0, 12), bytes([0, 4, 255, 255]))
+    write_matches(path, range(3))
+    with RecordReader(str(path)) as rd:
+        recs = list(rd)
+        assert rd.truncated == 0
+    assert recs[0].seed == 2**64 - 1 and recs[0].first_round and recs[0].points == (37, 0)
+    assert recs[1][:4] == (5, False, 3, (0, 12)) and recs[1].actions == bytes([0, 4, 255, 255])
+    assert len(recs) > 5
+    assert all(verify(r) is None for r in recs[2:])
+    n, bad = verify_file(str(path))
+    assert n == len(recs) and [i for i, _ in bad] == [0, 1]
+
+@pytest.mark.parametrize("data", [b"", MAGIC[:3]])
+def test_empty_or_headerless_file(tmp_path, data):
+    path = tmp_path / "corto.bin"
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match="vacío o truncado"):
+        RecordReader(str(path))
+
+def test_wrong_magic_or_version(tmp_path):
+    path = tmp_path / "otro.bin"
+    path.write_bytes(b"XXXXX" + bytes(20))
+    with pytest.raises(ValueError, match="no es un registro"):
+        RecordReader(str(path))
+    path.write_bytes(MAGIC[:-1] + b"\x09" + bytes(20))
+    with pytest.raises(ValueError, match="versión 9"):
+        RecordReader(str(path))
+
+def test_truncated_tail_is_reported(tmp_path):
+    path = tmp_path / "rondas.bin"
+    write_matches(path, [7])
+    with RecordReader(str(path)) as rd:
+        full = list(rd)
+    data = path.read_bytes()
+    last = HEADER.size + len(full[-1].actions)
+    for cut in (last - 3, 1):     # dentro de la cabecera del último registro y de sus acciones
+        path.write_bytes(data[:-cut])
+        with RecordReader(str(path)) as rd:
+            assert list(rd) == full[:-1]
+            assert rd.truncated == last - cut
@@ -0,0 +1,76 @@
+"""Servidor de mesas: cada conexión opera solo sobre sus mesas, que no sobreviven a su
+desconexión, y un pedido que falla igual se responde y libera su lugar."""
+import asyncio
+import json
+
+from domino.server import MAX_LINE, TableServer
+
+async def _call(reader, writer, **req) -> dict:
+    writer.write(json.dumps(req).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+async def _disconnect_drops_tables():
+    server = TableServer(None)
+    srv = await server.start("127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    r1, w1 = await asyncio.open_connection("127.0.0.1", port, limit=MAX_LINE)
+    r2, w2 = await asyncio.open_connection("127.0.0.1", port, limit=MAX_LINE)
+    mine = [(await _call(r1, w1, op="new", seed=i))["table"] for i in range(3)]
+    other = (await _call(r2, w2, op="new", seed=9))["table"]
+    await _call(r1, w1, op="close", table=mine[0])
+    assert sorted(server.tables) == sorted(mine[1:] + [other])
+    w1.close()
+    await w1.wait_closed()
+    for _ in range(100):
+        if len(server.tables) == 1:
+            break
+        await asyncio.sleep(0.01)
+    assert list(server.tables) == [other]
+    assert (await _call(r2, w2, op="state", table=other))["ok"]
+    w2.close()
+    await server.close()
+
+def test_disconnect_drops_tables():
+    asyncio.run(_disconnect_drops_tables())
+
+async def _foreign_tables_rejected():
+    server = TableServer(None)
+    srv = await server.start("127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    r1, w1 = await asyncio.open_connection("127.0.0.1", port, limit=MAX_LINE)
+    r2, w2 = await asyncio.open_connection("127.0.0.1", port, limit=MAX_LINE)
+    tid = (await _call(r1, w1, op="new", seed=3))["table"]
+    before = await _call(r1, w1, op="state", table=tid)
+    for req in ({"op": "state"}, {"op": "move", "index": -1}, {"op": "close"}):
+        resp = await _call(r2, w2, table=tid, **req)
+        assert not resp["ok"] and "otra conexión" in resp["error"]
+    assert tid in server.tables
+    after = await _call(r1, w1, op="state", table=tid)
+    assert after["events"] == [] and after["chain"] == before["chain"]
+    assert (await _call(r1, w1, op="close", table=tid))["ok"]
+    assert tid not in server.tables
+    for w in (w1, w2):
+        w.close()
+    await server.close()
+
+def test_foreign_tables_rejected():
+    asyncio.run(_foreign_tables_rejected())
+
+async def _internal_error_releases_slot():
+    server = TableServer(None, max_inflight=2)
+
+    async def broken(req, owned=None):
+        raise RuntimeError("falla")
+    server.dispatch = broken
+    srv = await server.start("127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    r, w = await asyncio.open_connection("127.0.0.1", port, limit=MAX_LINE)
+    for i in range(5):    # más pedidos que lugares: si alguno no se liberara, se colgaría
+        resp = await asyncio.wait_for(_call(r, w, op="state", id=i), 5)
+        assert resp == {"id": i, "ok": False, "error": "error interno: RuntimeError"}
+    w.close()
+    await server.close()
+
+def test_internal_error_releases_slot():
+    asyncio.run(_internal_error_releases_slot())
@@ -0,0 +1,11 @@
+"""vsim reproduce las rondas de Game con los mismos pesos de la heurística."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from domino import vsim  # noqa: E402
+
+@pytest.mark.parametrize("weights", [None, (1.0, 2.0, 0.1, 0.7), (1.4, 0.0, 3.0, 0.0)])
+def test_matches_game(weights):
+    kwargs = {} if weights is None else {"weights": weights}
+    assert vsim.validate_against_game(8, seed=3, **kwargs) > 0